@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from subjects import COMMON_FIELDS
+from curriculum import get_curriculum
+from grading import grade_semester
+
+# Percentages have one histogram bin per percent (0..100); marks have one bin
+# per mark, 0 to the curriculum's max_marks
+PERCENT_BINS = 101
+
+
+def mark_bins(curriculum=None):
+    return get_curriculum(curriculum).max_marks + 1
+
+
+# Rollup contributions of a batch of semester records, ready to be added to
+# (sign=1) or subtracted from (sign=-1) the stored aggregates. `frame` holds
+# one row per student with the subject columns and optional common inputs.
+def rollup_deltas(semester, frame, sign=1, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    subjects = list(curriculum.semesters[semester])
+    if len(frame) == 0:
+        return {"semester": [], "subjects": [], "histogram": [], "percentages": [], "factors": []}
+
+    grades = grade_semester(frame[subjects].to_numpy(dtype=float), semester, curriculum)
+    marks = grades.marks
+    passed = grades.passed.astype(float)
+    percentage = grades.percentage
+    students = len(frame)
+
+    bins = mark_bins(curriculum)
+    marks_bin = np.clip(np.floor(marks), 0, bins - 1).astype(int)
+    percent_bins = np.clip(np.floor(percentage), 0, PERCENT_BINS - 1).astype(int)
+
+    histogram = []
+    for column, subject in enumerate(subjects):
+        counts = np.bincount(marks_bin[:, column], minlength=bins)
+        histogram += [(semester, subject, int(b), sign * int(counts[b])) for b in np.flatnonzero(counts)]
+    percent_counts = np.bincount(percent_bins, minlength=PERCENT_BINS)
+
+    factors = []
+    for factor in COMMON_FIELDS:
+        if factor not in frame.columns:
+            continue
+        x = pd.to_numeric(frame[factor], errors="coerce").to_numpy(dtype=float)
+        present = ~np.isnan(x)
+        x, y_pass, y_pct = x[present], passed[present], percentage[present]
+        factors.append((
+            semester, factor, sign * int(present.sum()),
+            sign * float(x.sum()), sign * float((x * x).sum()),
+            sign * float(y_pass.sum()), sign * float((x * y_pass).sum()),
+            sign * float(y_pct.sum()), sign * float((y_pct * y_pct).sum()), sign * float((x * y_pct).sum()),
+        ))
+
+    return {
+        "semester": [(semester, sign * students, sign * int(passed.sum()),
+                      sign * float(percentage.sum()), sign * float((percentage * percentage).sum()))],
+        "subjects": [
+            (semester, subject, sign * students, sign * int(grades.failed[:, column].sum()),
+             sign * float(marks[:, column].sum()), sign * float((marks[:, column] ** 2).sum()))
+            for column, subject in enumerate(subjects)
+        ],
+        "histogram": histogram,
+        "percentages": [(semester, int(b), sign * int(percent_counts[b])) for b in np.flatnonzero(percent_counts)],
+        "factors": factors,
+    }
+
+
+def _std(total, total_sq, n):
+    variance = np.where(n > 0, total_sq / np.maximum(n, 1) - (total / np.maximum(n, 1)) ** 2, np.nan)
+    return np.sqrt(np.maximum(variance, 0))
+
+
+# Pass rate and percentage statistics per semester
+def semester_overview(rollups):
+    df = rollups["semester"].copy()
+    if df.empty:
+        return df
+    df["Pass Rate %"] = df["passed"] / df["students"] * 100
+    df["Mean %"] = df["pct_sum"] / df["students"]
+    df["Std %"] = _std(df["pct_sum"], df["pct_sum_sq"], df["students"])
+    return df.rename(columns={"semester": "Semester", "students": "Students", "passed": "Passed"})[
+        ["Semester", "Students", "Passed", "Pass Rate %", "Mean %", "Std %"]
+    ]
+
+
+# Pass rate, mean and spread of marks per semester and subject
+def subject_overview(rollups):
+    df = rollups["subjects"].copy()
+    if df.empty:
+        return df
+    df["Pass Rate %"] = (1 - df["failed"] / df["students"]) * 100
+    df["Mean Marks"] = df["marks_sum"] / df["students"]
+    df["Std Marks"] = _std(df["marks_sum"], df["marks_sum_sq"], df["students"])
+    return df.rename(columns={"semester": "Semester", "subject": "Subject", "students": "Students", "failed": "Failures"})[
+        ["Semester", "Subject", "Students", "Failures", "Pass Rate %", "Mean Marks", "Std Marks"]
+    ]
+
+
+def top_failing_subjects(rollups, limit=10):
+    overview = subject_overview(rollups)
+    if overview.empty:
+        return overview
+    return overview.sort_values(["Failures", "Pass Rate %"], ascending=[False, True]).head(limit).reset_index(drop=True)
+
+
+# Marks from a fixed-bin histogram at the given quantiles (0..1)
+def histogram_percentiles(counts, quantiles=(0.1, 0.25, 0.5, 0.75, 0.9)):
+    counts = np.asarray(counts, dtype=float)
+    total = counts.sum()
+    if total <= 0:
+        return {q: None for q in quantiles}
+    cumulative = np.cumsum(counts)
+    return {q: int(np.searchsorted(cumulative, q * total, side="left")) for q in quantiles}
+
+
+# Full 0..max_marks histogram of one subject's marks
+def mark_distribution(rollups, semester, subject, curriculum=None):
+    bins = mark_bins(curriculum)
+    df = rollups["histogram"]
+    df = df[(df["semester"] == semester) & (df["subject"] == subject)]
+    counts = np.zeros(bins, dtype=int)
+    counts[df["bin"].to_numpy(dtype=int)] = df["count"].to_numpy(dtype=int)
+    return pd.Series(counts, index=pd.RangeIndex(bins, name="Marks"), name="Students")
+
+
+def percentage_distribution(rollups, semester):
+    df = rollups["percentages"]
+    df = df[df["semester"] == semester]
+    counts = np.zeros(PERCENT_BINS, dtype=int)
+    counts[df["bin"].to_numpy(dtype=int)] = df["count"].to_numpy(dtype=int)
+    return pd.Series(counts, index=pd.RangeIndex(PERCENT_BINS, name="Percentage"), name="Students")
+
+
+# Percentiles of every subject's marks, from the histograms
+def subject_percentiles(rollups, quantiles=(0.1, 0.25, 0.5, 0.75, 0.9), curriculum=None):
+    bins = mark_bins(curriculum)
+    rows = []
+    for (semester, subject), group in rollups["histogram"].groupby(["semester", "subject"], sort=True):
+        counts = np.zeros(bins)
+        counts[group["bin"].to_numpy(dtype=int)] = group["count"].to_numpy()
+        percentiles = histogram_percentiles(counts, quantiles)
+        rows.append({"Semester": semester, "Subject": subject,
+                     **{f"P{int(q * 100)}": value for q, value in percentiles.items()}})
+    return pd.DataFrame(rows)
+
+
+def _pearson(n, sx, sxx, sy, syy, sxy):
+    covariance = n * sxy - sx * sy
+    spread = np.sqrt(np.maximum(n * sxx - sx * sx, 0) * np.maximum(n * syy - sy * sy, 0))
+    return np.where(spread > 0, covariance / np.where(spread > 0, spread, 1), np.nan)
+
+
+# Pearson correlation of Attendance/Assignments/Participation with passing and
+# with the semester percentage
+def factor_correlations(rollups):
+    df = rollups["factors"].copy()
+    if df.empty:
+        return df
+    n = df["n"].to_numpy(dtype=float)
+    df["Corr. with Pass"] = _pearson(n, df["x_sum"], df["x_sum_sq"], df["passed_sum"], df["passed_sum"], df["x_passed_sum"])
+    df["Corr. with Percentage"] = _pearson(n, df["x_sum"], df["x_sum_sq"], df["pct_sum"], df["pct_sum_sq"], df["x_pct_sum"])
+    return df.rename(columns={"semester": "Semester", "factor": "Factor", "n": "Students"})[
+        ["Semester", "Factor", "Students", "Corr. with Pass", "Corr. with Percentage"]
+    ]
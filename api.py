@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import os
+from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from curriculum import get_curriculum, load_curricula
+from evaluation import evaluate_batch, evaluate_student, recommendations_for
+from importer import sheet_bounds
+from predictor import load_models
+from recommendations import curriculum_bundles
+from metrics import METRICS, span
+
+# Largest batch accepted per request
+MAX_BATCH = 10_000
+# Worker processes for CPU-heavy batches
+WORKERS = int(os.environ.get("API_WORKERS", os.cpu_count() or 1))
+# Batches smaller than this are evaluated in the event loop's thread pool instead
+POOL_MIN_BATCH = 500
+
+
+# Workers come from a fork server, or are spawned where there is none; forking
+# the running server, which already has threads, could deadlock them
+def _pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class StudentRecord(BaseModel):
+    semester: int
+    marks: dict[str, float]
+    curriculum: str | None = None
+
+
+class BatchRequest(BaseModel):
+    semester: int
+    curriculum: str | None = None
+    students: list[dict[str, Any]] = Field(max_length=MAX_BATCH)
+
+
+# Models are loaded once per process and curriculum, including in each pool worker
+@lru_cache(maxsize=None)
+def get_models(curriculum_id=None):
+    return load_models(curriculum=curriculum_id)
+
+
+def _evaluate_batch(records, semester, curriculum_id):
+    return evaluate_batch(records, semester, get_models(curriculum_id), curriculum_id)
+
+
+def _curriculum(curriculum_id):
+    try:
+        return get_curriculum(curriculum_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown curriculum {curriculum_id}")
+
+
+def _check_semester(semester, curriculum):
+    if semester not in curriculum.semesters:
+        raise HTTPException(status_code=404, detail=f"Unknown semester {semester}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Train or load the models before the workers start so they only read them
+    for curriculum_id in load_curricula():
+        get_models(curriculum_id)
+    app.state.pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=_pool_context())
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="Student Performance API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+# Prometheus scrape endpoint for this process's counters and spans
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return METRICS.prometheus_text()
+
+
+@app.get("/curricula")
+async def curricula():
+    return [
+        {"id": curriculum.id, "name": curriculum.name, "version": curriculum.version,
+         "max_marks": curriculum.max_marks, "pass_mark": curriculum.pass_mark}
+        for curriculum in load_curricula().values()
+    ]
+
+
+@app.get("/subjects")
+async def subjects(curriculum: str | None = Query(None)):
+    return _curriculum(curriculum).semesters
+
+
+@app.post("/evaluate")
+async def evaluate(record: StudentRecord):
+    curriculum = _curriculum(record.curriculum)
+    _check_semester(record.semester, curriculum)
+    bounds = sheet_bounds(record.semester, curriculum)
+    missing = [subject for subject in curriculum.semesters[record.semester] if subject not in record.marks]
+    invalid = [column for column, value in record.marks.items()
+               if column in bounds and not bounds[column][0] <= value <= bounds[column][1]]
+    if missing or invalid:
+        raise HTTPException(status_code=422, detail={"missing": missing, "invalid": invalid})
+    with span("api_evaluate"):
+        return evaluate_student(record.marks, record.semester, get_models(curriculum.id), curriculum)
+
+
+@app.post("/evaluate/batch")
+async def evaluate_cohort(batch: BatchRequest):
+    curriculum = _curriculum(batch.curriculum)
+    _check_semester(batch.semester, curriculum)
+    loop = asyncio.get_running_loop()
+    executor = app.state.pool if len(batch.students) >= POOL_MIN_BATCH else None
+    try:
+        with span("api_evaluate_batch"):
+            result = await loop.run_in_executor(executor, _evaluate_batch, batch.students, batch.semester, curriculum.id)
+        METRICS.count("api_batch_records_total", len(batch.students))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    # The result is already plain JSON types, so skip FastAPI's encoder
+    return JSONResponse(result)
+
+
+@app.get("/recommendations/{subject}")
+async def recommendations(subject: str, curriculum: str | None = Query(None)):
+    curriculum = _curriculum(curriculum)
+    if subject not in curriculum_bundles(curriculum):
+        raise HTTPException(status_code=404, detail=f"Unknown subject {subject}")
+    return recommendations_for([subject], curriculum)[0]
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get("API_HOST", "127.0.0.1"), port=int(os.environ.get("API_PORT", "8000")))
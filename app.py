@@ -1,10 +1,59 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from pathlib import Path
+import io
+import uuid
 
-# Inject custom CSS
-st.markdown("""
+from curriculum import get_curriculum, load_curricula
+from grading import summary_frame
+from evaluation import evaluate_student
+from importer import IMPORT_DIR, STUDENT_ID_COLUMN, import_mark_sheet, resolve_import_path
+from predictor import SEED, load_models
+from store import SQLitePerformanceStore, database_path
+from assets import AssetLibrary
+from recommendations import StudyPlanArchive, gather_recommendations
+from search import SyllabusIndex
+from metrics import METRICS, span
+import analytics
+from whatif import simulate
+from transcripts import export_transcripts_in_subprocess
+
+
+# Trained pass/fail models, loaded (or trained and saved) once per server process and curriculum
+@st.cache_resource
+def get_models(curriculum_id):
+    return load_models(curriculum=curriculum_id)
+
+# Performance records database, one shared connection per server process and curriculum
+@st.cache_resource
+def get_store(curriculum_id):
+    return SQLitePerformanceStore(database_path(curriculum_id), curriculum_id)
+
+# Syllabus PDFs, past papers and images, scanned once and cached in memory per server process
+@st.cache_resource
+def get_assets():
+    return AssetLibrary()
+
+# Full-text index over the syllabus PDFs; only new or changed files are re-parsed on startup
+@st.cache_resource
+def get_search_index():
+    return SyllabusIndex().open()
+
+# Helper function to display images
+def display_image(image_key, width=50):
+    with span("display_image"):
+        st.image(get_assets().image(image_key, width), width=width)
+
+# One full run of the page: programme and student pickers, semester tabs,
+# the sections defined below and the overall summary
+def main():
+    # Read as globals by the helpers and fragments below, also when a
+    # fragment reruns on its own
+    global curriculum, store, student_id
+
+    # Inject custom CSS
+    with span("css"):
+        st.markdown("""
     <style>
     body {
         background: linear-gradient(135deg, #ff9ff3 0%, #54a0ff 100%);
@@ -29,7 +78,7 @@ st.markdown("""
         border-radius: 8px;
         background-color: #f0f8ff;
     }
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background: linear-gradient(45deg, #ff6b81, #ffcc5c);
         color: white;
         border: none;
@@ -37,7 +86,7 @@ st.markdown("""
         padding: 12px;
         width: 100%;
     }
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         background: linear-gradient(45deg, #ffcc5c, #ff6b81);
     }
     .performance-metric {
@@ -50,184 +99,160 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Constants
-N_SAMPLES = 10000
-PASS_THRESHOLD = 50
-SEED = 42
-np.random.seed(SEED)
-
-# Semester-wise subjects
-SEMESTER_SUBJECTS = {
-    1: ["C Programming", "Differential Equations", "Fundamentals of IT", "Descriptive Statistics","General English 1","Value Education"],
-    2: ["DS through C", "Probability Distributions", "Abstract Algebra", "Operating Systems","General English 2","Indian Heritage And Culture"],
-    3: ["Database Management Systems", "Computer Organizations", "Python", "Statistical Methods","Environmental Studies"],
-    4: ["Java", "Statistical Inference", "Computer Networks", "R Programming", "Data Warehousing", "Accounting And Financial Management"],
-    5: ["Artificial Intelligence", "Machine Learning", "Applied Statistics", "Software Engineering", "Operations Research", "Data Visualization Tools"],
-    6: ["Data Security", "Big Data Analytics", "Software Testing", "Cloud Computing", "Marketing Data Analytics"]
-}
-
-# Recommendations mapping
-book_mapping = {
-    "C Programming": "The C Programming Language by Kernighan and Ritchie",
-    "Differential Equations": "Elementary Differential Equations by Boyce and DiPrima",
-    "Fundamentals of IT": "Introduction to Information Technology by Turban, Rainer and Potter",
-    "Descriptive Statistics": "Statistics for Engineers and Scientists by William Navidi",
-    "General English 1": "Epitome of Wisdom by Maruthi Publications",
-    "Value Education": "Human Values - Development Program by AIACHE",
-    "DS through C": "Data Structures Using C by Aaron M. Tenenbaum",
-    "Probability Distributions": "Introduction to Probability and Statistics by Mendenhall and Beaver",
-    "Abstract Algebra": "Abstract Algebra by David S. Dummit and Richard M. Foote",
-    "Operating Systems": "Operating System Concepts by Silberschatz, Galvin, and Gagne",
-    "General English 2": "Epitome of Wisdom by Maruthi Publications",
-    "Indian Heritage And Culture": "The Wonder That Was India by A.L. Basham",
-    "Database Management Systems": "Database System Concepts by Silberschatz, Korth, and Sudarshan",
-    "Computer Organizations": "Computer Organization and Design by Patterson and Hennessy",
-    "Python": "Automate the Boring Stuff with Python by Al Sweigart",
-    "Statistical Methods": "Statistics for Engineers and Scientists by William Navidi",
-    "Environmental Studies": "Environmental Studies by Benny Joseph",
-    "Java": "Effective Java by Joshua Bloch",
-    "Statistical Inference": "Statistical Inference by Casella and Berger",
-    "Computer Networks": "A Top-Down Approach by Kurose and Ross",
-    "R Programming": "R for Data Science by Wickham and Grolemund",
-    "Data Warehousing": "The Data Warehouse Toolkit by Ralph Kimball",
-    "Accounting And Financial Management": "Financial Accounting by Libby, Libby, and Short",
-    "Artificial Intelligence": "Artificial Intelligence: A Modern Approach by Russell and Norvig",
-    "Machine Learning": "Pattern Recognition and Machine Learning by Christopher M. Bishop",
-    "Applied Statistics": "Applied Statistics and Probability for Engineers by Montgomery and Runger",
-    "Software Engineering": "Software Engineering by Ian Sommerville",
-    "Operations Research": "Introduction to Operations Research by Hillier and Lieberman",
-    "Data Visualization Tools": "Storytelling with Data by Cole Nussbaumer Knaflic",
-    "Data Security": "Introduction to Algorithms by Cormen, Leiserson, Rivest, and Stein",
-    "Big Data Analytics": "Big Data: A Revolution That Will Transform How We Live by Mayer-Schönberger",
-    "Software Testing": "Software Testing by Ron Patton",
-    "Cloud Computing": "Cloud Computing: Concepts, Technology & Architecture by Thomas Erl",
-    "Marketing Data Analytics": "Marketing Analytics by Winston"
-}
-
-topic_mapping = {
-    "C Programming": "Pointers, programming constructs, Control structures, Functions, Arrays and strings, Pointers and file handling",
-    "Differential Equations": "First Order Differential Equations, Applications of differential equations, Interpolation",
-    "Fundamentals of IT": "Computer terminology and number systems, Modern communication technologies, Applications of IT",
-    "Descriptive Statistics": "Measures of central tendency, Measures of dispersion, Random variables, Probability basics",
-    "General English 1": "Fundamentals of communication, Language proficiency, Writing skills",
-    "Value Education": "Ethics, Moral values, Personality development, Life skills",
-    "DS through C": "Arrays, Linked Lists, Stacks, Queues, Searching and sorting, Graphs, Trees",
-    "Probability Distributions": "Binomial, Poisson, Normal Distributions, Sampling distributions",
-    "Abstract Algebra": "Group theory, Normal subgroups, Permutations, Linear equation, Eigenvalues and eigenvectors",
-    "Operating Systems": "Process Management, Memory Management, File systems, Deadlocks",
-    "General English 2": "Advanced communication skills, Literary appreciation, Functional grammar",
-    "Indian Heritage And Culture": "The Indus Valley Civilization, Vedic culture, Major empires, Religious traditions, Art, Architecture",
-    "Database Management Systems": "SQL, Normalization, Indexing, Relational database concepts, NoSQL basics",
-    "Computer Organizations": "CPU Architecture, Memory Hierarchy, Input/output systems",
-    "Python": "Basic syntax, Libraries, Data manipulation, Object-oriented programming",
-    "Statistical Methods": "Hypothesis testing, Regression analysis, Non-parametric tests, ANOVA",
-    "Environmental Studies": "Environmental awareness, Sustainable development, Gender issues",
-    "Java": "OOP, Exception Handling, Multithreading",
-    "Statistical Inference": "Likelihood ratio tests, Bayesian inference, Hypothesis testing",
-    "Computer Networks": "Input/output systems, Memory hierarchy, CPU architecture",
-    "R Programming": "Statistical functions, Visualization, Basic syntax",
-    "Data Warehousing": "Data warehouse architecture, OLAP, Association rules, Evaluation metrics",
-    "Accounting And Financial Management": "Balance Sheets, Income Statements",
-    "Artificial Intelligence": "Search Algorithms, Knowledge Representation, Adversarial search, Expert systems",
-    "Machine Learning": "Supervised Learning, Unsupervised Learning, Model evaluation, Neural networks",
-    "Applied Statistics": "Discriminant analysis, Time Series Analysis, Factor analysis, Growth curves",
-    "Software Engineering": "Requirements engineering, SDLC, Testing methodologies",
-    "Operations Research": "Linear Programming, Network flows, Transportation and assignment problems",
-    "Data Visualization Tools": "Tools, Visualization principles, Visualizing complex data",
-    "Data Security": "Firewalls, Security attacks, Encryption",
-    "Big Data Analytics": "Hadoop Ecosystem, HBase, Hive, Pig, NoSQL",
-    "Software Testing": "Testing types, Test case design, Quality metrics",
-    "Cloud Computing": "Cloud model, Virtualization, Cloud architecture",
-    "Marketing Data Analytics": "Market research, Market basket analysis, Customer segmentation"
-}
-
-# Define static folders
-STATIC_DIR = Path("static/data/previous_papers")
-SYLLABUS_DIR = Path("static/data/syllabus")
-IMAGE_DIR = Path("static/images")
-
-# Image paths (updated to .jpg)
-IMAGE_PATHS = {
-    "tracking": IMAGE_DIR / "tracking.jpg",
-    "papers": IMAGE_DIR / "papers.jpg",
-    "register": IMAGE_DIR / "register.jpg",
-    "certificate": IMAGE_DIR / "certificate.jpg",
-    "pen_paper": IMAGE_DIR / "pen_paper.jpg",
-    "books": IMAGE_DIR / "books.jpg",
-    "bulb": IMAGE_DIR / "bulb.jpg",
-    "question_papers": IMAGE_DIR / "question_papers.jpg",
-    "syllabus": IMAGE_DIR / "syllabus.jpg",
-}
-
-# Create syllabus file mapping based on your uploaded syllabus files
-syllabus_mapping = {
-    "Abstract Algebra": "Abstract_Algebra_Syllabus.pdf",
-    "Accounting And Financial Management": "Accounting_And_Financial_Management_Syllabus.pdf",
-    "Applied Statistics": "Applied_statistics_Syllabus.pdf",
-    "Artificial Intelligence": "Artificial_Intelligence_Syllabus.pdf",
-    "Big Data Analytics": "Big_Data_Analytics_Syllabus.pdf",
-    "C Programming": "C_Programming_Syllabus.pdf",
-    "Cloud Computing": "Cloud_Computing_Syllabus.pdf",
-    "Computer Networks": "Computer_Networks_Syllabus.pdf",
-    "Computer Organizations": "Computer_Organizations_Syllabus.pdf",
-    "Data Security": "Data_Security_Syllabus.pdf",
-    "Data Visualization Tools": "Data_Visualization_Tools_Syllabus.pdf",
-    "Data Warehousing": "Data_Warehousing_Syllabus.pdf",
-    "Database Management Systems": "Database_Management_Systems_Syllabus.pdf",
-    "Descriptive Statistics": "Descriptive_Statistics_Syllabus.pdf",
-    "Differential Equations": "Differential_Equations_Syllabus.pdf",
-    "DS through C": "DS_through_C_Syllabus.pdf",
-    "Environmental Studies": "Environmental_Studies_Syllabus.pdf",
-    "Fundamentals of IT": "Fundamentals_of_IT_Syllabus.pdf",
-    "General English 1": "General_English_1_Syllabus.pdf",
-    "General English 2": "General_English_2_Syllabus.pdf",
-    "Indian Heritage And Culture": "Indian_Heritage_And_Culture_Syllabus.pdf",
-    "Java": "Java_Syllabus.pdf",
-    "Machine Learning": "Machine_Learning_Syllabus.pdf",
-    "Marketing Data Analytics": "Marketing_Data_Analytics_Syllabus.pdf",
-    "Operating Systems": "Operating_Systems_Syllabus.pdf",
-    "Operations Research": "Operations_Research_Syllabus.pdf",
-    "Probability Distributions": "Probability_Distributions_Syllabus.pdf",
-    "Python": "Python_Syllabus.pdf",
-    "R Programming": "R_Programming_Syllabus.pdf",
-    "Software Engineering": "Software_Engineering_Syllabus.pdf",
-    "Software Testing": "Software_Testing_Syllabus.pdf",
-    "Statistical Inference": "Statistical_Inference_Syllabus.pdf",
-    "Statistical Methods": "Statistical_Methods_Syllabus.pdf",
-    "Value Education": "Value_Education_Syllabus.pdf"
-}
+    np.random.seed(SEED)
 
-# Helper function to display images
-def display_image(image_key, width=50):
-    if IMAGE_PATHS[image_key].exists():
-        st.image(str(IMAGE_PATHS[image_key]), width=width)
+    # Streamlit App
+    st.title("Student Performance Prediction and Tracking")
+    display_image("tracking", width=100)
+
+    # Programme the student follows. Curricula are compiled once per process and
+    # shared by every session; a session only keeps the chosen id.
+    curricula = load_curricula()
+    if len(curricula) > 1:
+        curriculum_ids = list(curricula)
+        curriculum_id = st.selectbox(
+            "Programme:",
+            curriculum_ids,
+            index=curriculum_ids.index(get_curriculum().id),
+            format_func=lambda key: f"{curricula[key].name} (v{curricula[key].version})",
+            key="curriculum"
+        )
     else:
-        st.image(f"https://via.placeholder.com/{width}x{width}.png?text={image_key.replace('_', '+')}", width=width)
+        curriculum_id = None
+    curriculum = get_curriculum(curriculum_id)
 
-# Streamlit App
-st.title("Student Performance Prediction and Tracking")
-display_image("tracking", width=100)
+    # Student whose records are tracked; new sessions get a generated id
+    if 'default_student_id' not in st.session_state:
+        st.session_state.default_student_id = uuid.uuid4().hex[:8].upper()
+    student_id = st.text_input("Student ID:", value=st.session_state.default_student_id, key="student_id").strip()
+    store = get_store(curriculum.id)
 
-# Semester Selection Tabs
-tabs = st.tabs([f"Semester {i}" for i in range(1, 7)])
+    # Initialize session state for cohort imports
+    if 'cohort_imports' not in st.session_state:
+        st.session_state.cohort_imports = {}
 
-# Initialize session state for tracking performance across semesters
-if 'performance_data' not in st.session_state:
-    st.session_state.performance_data = {}
+    # Semester Selection Tabs
+    with span("tabs"):
+        tabs = st.tabs([f"Semester {i}" for i in curriculum.semesters])
 
-for semester, tab in enumerate(tabs, start=1):
-    with tab:
-        st.header(f"Semester {semester} Performance Tracking")
-        display_image("papers")
-        
+        for semester, tab in zip(curriculum.semesters, tabs):
+            with tab:
+                semester_tab(semester)
+
+    cohort_import()
+    cohort_transcripts()
+    syllabus_search()
+    department_dashboard()
+    what_if()
+
+    # Add a summary section for all semesters
+    st.header("Overall Performance Summary")
+    with span("summary_load"):
+        performance_data = store.get_performance(student_id) if student_id else {}
+    if performance_data:
+        with span("summary_render"):
+            df_summary = summary_frame(performance_data, curriculum)
+            st.dataframe(df_summary.style.highlight_max(axis=0, subset=["Percentage"]))
+    else:
+        st.info("No semester data available yet. Please submit data for at least one semester.")
+
+    imported = sorted(key for key in st.session_state.cohort_imports if key[0] == curriculum.id)
+    if imported:
+        st.subheader("Imported Cohorts")
+        st.dataframe(pd.DataFrame([st.session_state.cohort_imports[key] for key in imported]))
+
+# Render a submitted semester's metrics, status and recommendations
+def show_analysis(semester, student_data, result, celebrate=False):
+    # Display performance metrics
+    st.header("Performance Analysis")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Marks", f"{result['total_marks']}/{result['max_possible']}")
+    with col2:
+        st.metric("Average Score", f"{result['avg_score']:.1f}/{curriculum.max_marks}")
+    with col3:
+        st.metric("Performance", f"{result['performance_percentage']:.1f}%")
+    with col4:
+        st.metric("Predicted Pass Chance", f"{result['pass_probability'] * 100:.1f}%")
+
+    # Results
+    if result["pass_status"] == 1:
+        st.success("🎉 Status: Passed! All the best! 🎉")
+        if celebrate:
+            st.balloons()
+    else:
+        failed_subjects = result["failed_subjects"]
+        st.error("😓 Status: Needs Improvement 😓")
+        st.subheader("Subjects Requiring Attention:")
+        for subject in failed_subjects:
+            st.write(f"- {subject} (Score: {student_data[subject]}/{curriculum.max_marks})")
+
+        # Enhanced Recommendations, from the bundles precomputed per subject
+        recommendations = gather_recommendations(failed_subjects, get_assets(), get_search_index(), curriculum)
+
+        # Display recommendations
+        if recommendations["Books"]:
+            st.subheader("Recommended Books:")
+            display_image("books")
+            for subject, book in recommendations["Books"]:
+                st.markdown(f"**{subject}:**")
+                st.write(book)
+                st.write("")
+
+        if recommendations["Important Topics"]:
+            st.subheader("Important Topics to Focus On:")
+            display_image("bulb")
+            for subject, topics in recommendations["Important Topics"]:
+                st.markdown(f"**{subject}:**")
+                # Each topic is linked to the syllabus unit that covers it
+                for topic, unit in topics:
+                    if unit:
+                        st.write(f"- {topic} ({unit['Unit']}, page {unit['Page']})")
+                    else:
+                        st.write(f"- {topic}")
+                st.write("")
+
+        if recommendations["Previous Papers"]:
+            st.subheader("Previous Question Papers:")
+            display_image("question_papers")
+            for subject, paper_data in recommendations["Previous Papers"]:
+                st.download_button(
+                    label=f"Download {subject} Previous Papers",
+                    data=paper_data,
+                    file_name=f"{subject}_Previous_Papers.pdf",
+                    mime="application/pdf"
+                )
+
+        if recommendations["Syllabus"]:
+            st.subheader("Subject Syllabus:")
+            display_image("syllabus")
+            for subject, syllabus_data in recommendations["Syllabus"]:
+                st.download_button(
+                    label=f"Download {subject} Syllabus",
+                    data=syllabus_data,
+                    file_name=f"{subject}_Syllabus.pdf",
+                    mime="application/pdf"
+                )
+
+# One semester tab. Inputs are batched in a form and the tab is a fragment,
+# so typing reruns nothing and a submit reruns only this tab.
+@st.fragment
+@METRICS.rerun("fragment")
+@span("semester_tab")
+def semester_tab(semester):
+    st.header(f"Semester {semester} Performance Tracking")
+    display_image("papers")
+
+    with st.form(key=f"form_{semester}", border=False):
         student_data = {}
         
         # Subject inputs
-        for subject in SEMESTER_SUBJECTS[semester]:
+        for subject in curriculum.semesters[semester]:
             student_data[subject] = st.number_input(
-                f"{subject} (Max 60):", 
+                f"{subject} (Max {curriculum.max_marks}):", 
                 min_value=0, 
-                max_value=60, 
+                max_value=curriculum.max_marks, 
                 value=0, 
                 key=f"{semester}_{subject}"
             )
@@ -260,133 +285,230 @@ for semester, tab in enumerate(tabs, start=1):
             key=f"{semester}_Participation"
         )
 
-        if st.button("Submit & Predict Performance", key=f"submit_{semester}"):
-            # Store the data in session state
-            st.session_state.performance_data[semester] = student_data
-            
-            # Check pass/fail
-            fail_conditions = {subject: student_data[subject] < 30 for subject in SEMESTER_SUBJECTS[semester]}
-            subject_based_fail = any(fail_conditions.values())
-            pass_status = 0 if subject_based_fail else 1
-
-            # Calculate overall performance metrics
-            total_marks = sum(student_data[subject] for subject in SEMESTER_SUBJECTS[semester])
-            avg_score = total_marks / len(SEMESTER_SUBJECTS[semester])
-            performance_percentage = (total_marks / (60 * len(SEMESTER_SUBJECTS[semester]))) * 100
-
-            # Display performance metrics
-            st.header("Performance Analysis")
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Marks", f"{total_marks}/{(60 * len(SEMESTER_SUBJECTS[semester]))}")
-            with col2:
-                st.metric("Average Score", f"{avg_score:.1f}/60")
-            with col3:
-                st.metric("Performance", f"{performance_percentage:.1f}%")
-
-            # Results
-            if pass_status == 1:
-                st.success("🎉 Status: Passed! All the best! 🎉")
-                st.balloons()
+        submitted = st.form_submit_button("Submit & Predict Performance")
+
+    analysis_key = f"analysis_{semester}"
+    if submitted:
+        # Grade, predict and recommend with the shared core
+        result = evaluate_student(student_data, semester, get_models(curriculum.id), curriculum)
+        st.session_state[analysis_key] = ((curriculum.id, student_id), student_data, result)
+
+        # Store the data for this student; only a change to the stored data
+        # reruns the whole app, to refresh the summary
+        if not student_id:
+            st.warning("Enter a Student ID to save this semester's results.")
+        elif store.get_performance(student_id).get(semester) != student_data:
+            store.save_semester(student_id, semester, student_data)
+            st.session_state[f"celebrate_{semester}"] = True
+            st.rerun(scope="app")
+
+    # Keep showing the last analysis across reruns, for the current student and programme only
+    if analysis_key in st.session_state and st.session_state[analysis_key][0] == (curriculum.id, student_id):
+        celebrate = submitted or st.session_state.pop(f"celebrate_{semester}", False)
+        show_analysis(semester, *st.session_state[analysis_key][1:], celebrate=celebrate)
+
+# Bulk cohort import from CSV/Parquet mark sheets, rerunning on its own like the tabs
+@st.fragment
+@METRICS.rerun("fragment")
+@span("cohort_import")
+def cohort_import():
+    with st.expander("Bulk Cohort Import"):
+        st.write("Upload a CSV or Parquet mark sheet with one column per subject of the chosen semester "
+                 "(plus optional Student ID, Attendance, Assignments and Participation columns).")
+        import_semester = st.selectbox("Semester:", list(curriculum.semesters), key="import_semester")
+        uploaded_sheet = st.file_uploader("Mark sheet:", type=["csv", "parquet"], key="import_file")
+        # Server-side sheets are only offered when an import directory is configured
+        sheet_path = st.text_input("Or mark sheet name in the server's import directory:", key="import_path") if IMPORT_DIR else ""
+        build_plans = st.checkbox("Build study plans for failing students", key="import_plans")
+
+        # Persist the valid rows of each chunk when the sheet identifies students,
+        # and add the chunk's failing students to the study plan archive
+        def handle_imported_chunk(semester, chunk, graded, archive):
+            if STUDENT_ID_COLUMN in chunk.columns:
+                store.save_cohort(semester, chunk.loc[graded.index], id_column=STUDENT_ID_COLUMN)
+            if archive is not None:
+                failed_columns = [f"Failed {subject}" for subject in curriculum.semesters[semester]]
+                student_ids = graded[STUDENT_ID_COLUMN] if STUDENT_ID_COLUMN in graded.columns else graded.index
+                archive.add(graded[failed_columns].to_numpy(), semester, student_ids)
+
+        if st.button("Import Cohort", key="import_submit"):
+            source = uploaded_sheet if uploaded_sheet is not None else sheet_path.strip()
+            if not source:
+                st.warning("Please upload a mark sheet or enter a file name.")
             else:
-                failed_subjects = [subject for subject in SEMESTER_SUBJECTS[semester] if fail_conditions[subject]]
-                st.error("😓 Status: Needs Improvement 😓")
-                st.subheader("Subjects Requiring Attention:")
-                for subject in failed_subjects:
-                    st.write(f"- {subject} (Score: {student_data[subject]}/60)")
-
-                # Enhanced Recommendations
-                recommendations = {
-                    "Books": [],
-                    "Important Topics": [],
-                    "Previous Papers": [],
-                    "Syllabus": []
-                }
-                
-                for subject in failed_subjects:
-                    if subject in book_mapping:
-                        recommendations["Books"].append((subject, book_mapping[subject]))
-                    if subject in topic_mapping:
-                        recommendations["Important Topics"].append((subject, topic_mapping[subject]))
-                    
-                    # Previous Papers
-                    pdf_path = STATIC_DIR / f"{subject.replace(' ', '_')}.pdf"
-                    if pdf_path.exists():
-                        recommendations["Previous Papers"].append((subject, pdf_path))
-                    
-                    # Syllabus
-                    syllabus_filename = syllabus_mapping.get(subject)
-                    if syllabus_filename:
-                        syllabus_path = SYLLABUS_DIR / syllabus_filename
-                        if syllabus_path.exists():
-                            recommendations["Syllabus"].append((subject, syllabus_path))
-
-                # Display recommendations
-                if recommendations["Books"]:
-                    st.subheader("Recommended Books:")
-                    display_image("books")
-                    for subject, book in recommendations["Books"]:
-                        st.markdown(f"**{subject}:**")
-                        st.write(book)
-                        st.write("")
-
-                if recommendations["Important Topics"]:
-                    st.subheader("Important Topics to Focus On:")
-                    display_image("bulb")
-                    for subject, topics in recommendations["Important Topics"]:
-                        st.markdown(f"**{subject}:**")
-                        topic_list = [t.strip() for t in topics.split(',')]
-                        for topic in topic_list:
-                            st.write(f"- {topic}")
-                        st.write("")
-
-                if recommendations["Previous Papers"]:
-                    st.subheader("Previous Question Papers:")
-                    display_image("question_papers")
-                    for subject, pdf_path in recommendations["Previous Papers"]:
-                        try:
-                            with open(pdf_path, "rb") as file:
-                                st.download_button(
-                                    label=f"Download {subject} Previous Papers",
-                                    data=file,
-                                    file_name=f"{subject}_Previous_Papers.pdf",
-                                    mime="application/pdf"
-                                )
-                        except FileNotFoundError:
-                            st.warning(f"Previous papers not available for {subject}")
-
-                if recommendations["Syllabus"]:
-                    st.subheader("Subject Syllabus:")
-                    display_image("syllabus")
-                    for subject, syllabus_path in recommendations["Syllabus"]:
-                        try:
-                            with open(syllabus_path, "rb") as file:
-                                st.download_button(
-                                    label=f"Download {subject} Syllabus",
-                                    data=file,
-                                    file_name=f"{subject}_Syllabus.pdf",
-                                    mime="application/pdf"
-                                )
-                        except FileNotFoundError:
-                            st.warning(f"Syllabus not available for {subject}")
-
-# Add a summary section for all semesters
-st.header("Overall Performance Summary")
-if st.session_state.performance_data:
-    summary_data = []
-    for semester, data in st.session_state.performance_data.items():
-        total_marks = sum(data[subject] for subject in SEMESTER_SUBJECTS[semester])
-        max_possible = 60 * len(SEMESTER_SUBJECTS[semester])
-        percentage = (total_marks / max_possible) * 100
-        summary_data.append({
-            "Semester": semester,
-            "Total Marks": f"{total_marks}/{max_possible}",
-            "Percentage": f"{percentage:.1f}%",
-            "Status": "Pass" if all(data[subject] >= 30 for subject in SEMESTER_SUBJECTS[semester]) else "Needs Improvement"
-        })
-    
-    df_summary = pd.DataFrame(summary_data)
-    st.dataframe(df_summary.style.highlight_max(axis=0, subset=["Percentage"]))
-else:
-    st.info("No semester data available yet. Please submit data for at least one semester.")
\ No newline at end of file
+                progress = st.empty()
+                plans_file = io.BytesIO() if build_plans else None
+                archive = StudyPlanArchive(plans_file, curriculum) if build_plans else None
+                try:
+                    if isinstance(source, str):
+                        source = resolve_import_path(source)
+                    cohort = import_mark_sheet(
+                        source,
+                        import_semester,
+                        on_chunk=lambda chunk, graded: handle_imported_chunk(import_semester, chunk, graded, archive),
+                        on_progress=lambda rows: progress.write(f"Rows processed: {rows:,}"),
+                        curriculum=curriculum
+                    )
+                except (OSError, ValueError) as exc:
+                    st.error(f"Could not import mark sheet: {exc}")
+                else:
+                    if archive is not None:
+                        archive.close()
+                    # The imported data changed, so refresh the summary with a full rerun
+                    st.session_state.cohort_imports[(curriculum.id, import_semester)] = cohort.summary()
+                    st.session_state.last_import = (import_semester, cohort.students, cohort.rows_invalid,
+                                                    cohort.error_count, cohort.error_frame(),
+                                                    plans_file.getvalue() if plans_file is not None else None)
+                    st.rerun(scope="app")
+
+        if "last_import" in st.session_state:
+            semester, students, rows_invalid, error_count, errors, plans = st.session_state.last_import
+            st.success(f"Imported {students:,} students for Semester {semester}.")
+            if plans is not None:
+                st.download_button(
+                    label=f"Download Semester {semester} Study Plans",
+                    data=plans,
+                    file_name=f"Semester_{semester}_Study_Plans.zip",
+                    mime="application/zip",
+                    key="import_plans_download"
+                )
+            if error_count:
+                st.warning(f"{rows_invalid:,} rows rejected ({error_count:,} out-of-range or missing values).")
+                st.dataframe(errors)
+
+# Transcripts for every stored student of the programme, rendered into one
+# zip archive (by a worker pool in a child process for large cohorts),
+# rerunning on its own like the tabs
+@st.fragment
+@METRICS.rerun("fragment")
+@span("cohort_transcripts")
+def cohort_transcripts():
+    with st.expander("Cohort Transcripts"):
+        students = store.student_count()
+        if not students:
+            st.info("No stored students yet. Submit semesters or import a mark sheet to build transcripts.")
+            return
+        st.write(f"Build an HTML transcript for each of the {students:,} stored students, with semester totals, "
+                 "percentage, pass status and recommendations for failed subjects.")
+        if st.button("Build Transcripts", key="transcripts_submit"):
+            progress = st.progress(0.0, text="Rendering transcripts...")
+            archive = io.BytesIO()
+            try:
+                written = export_transcripts_in_subprocess(
+                    archive,
+                    store,
+                    on_progress=lambda done, total: progress.progress(min(done / max(total, 1), 1.0),
+                                                                      text=f"Transcripts rendered: {done:,}/{total:,}")
+                )
+            except OSError as exc:
+                st.error(f"Could not build transcripts: {exc}")
+            else:
+                st.session_state.transcripts = (curriculum.id, written, archive.getvalue())
+
+        if "transcripts" in st.session_state and st.session_state.transcripts[0] == curriculum.id:
+            _, written, transcripts = st.session_state.transcripts
+            st.success(f"Rendered {written:,} transcripts.")
+            st.download_button(
+                label="Download Transcripts",
+                data=transcripts,
+                file_name=f"{curriculum.id}_Transcripts.zip",
+                mime="application/zip",
+                key="transcripts_download"
+            )
+
+# Ranked search over the syllabus PDFs, rerunning on its own like the tabs
+@st.fragment
+@METRICS.rerun("fragment")
+@span("syllabus_search")
+def syllabus_search():
+    with st.expander("Search the Syllabus"):
+        query = st.text_input("Search topics across all syllabus units:", key="syllabus_query")
+        if query.strip():
+            hits = get_search_index().search(query)
+            if hits:
+                st.dataframe(pd.DataFrame(hits).drop(columns=["File"]), hide_index=True)
+            else:
+                st.info("No syllabus units match your search.")
+
+# Department-level analytics, served from the rollups the store maintains on every write
+@st.fragment
+@METRICS.rerun("fragment")
+@span("department_dashboard")
+def department_dashboard():
+    with st.expander("Department Dashboard"):
+        rollups = store.rollups()
+        overview = analytics.semester_overview(rollups)
+        if overview.empty:
+            st.info("No cohort data yet. Submit semesters or import a mark sheet to see department analytics.")
+            return
+
+        st.subheader("Pass Rate by Semester")
+        st.dataframe(overview, hide_index=True)
+        st.bar_chart(overview.set_index("Semester")["Pass Rate %"])
+
+        st.subheader("Subjects with the Most Failures")
+        st.dataframe(analytics.top_failing_subjects(rollups), hide_index=True)
+
+        st.subheader("Attendance, Assignments and Participation vs Outcomes")
+        st.dataframe(analytics.factor_correlations(rollups), hide_index=True)
+
+        st.subheader("Mark Distributions")
+        semesters = overview["Semester"].tolist()
+        col1, col2 = st.columns(2)
+        with col1:
+            semester = st.selectbox("Semester:", semesters, key="dashboard_semester")
+        with col2:
+            subject = st.selectbox("Subject:", ["Overall Percentage"] + list(curriculum.semesters[semester]), key="dashboard_subject")
+        if subject == "Overall Percentage":
+            st.bar_chart(analytics.percentage_distribution(rollups, semester))
+        else:
+            st.bar_chart(analytics.mark_distribution(rollups, semester, subject, curriculum))
+
+        percentiles = analytics.subject_percentiles(rollups, curriculum=curriculum)
+        st.dataframe(percentiles[percentiles["Semester"] == semester], hide_index=True)
+
+# What-if simulator: what a student needs in the subjects whose marks are not in yet
+@st.fragment
+@METRICS.rerun("fragment")
+@span("what_if")
+def what_if():
+    with st.expander("What-If Simulator"):
+        semester = st.selectbox("Semester:", list(curriculum.semesters), key="whatif_semester")
+        st.write("Enter the marks you already have; leave the rest empty.")
+        known = tuple(
+            st.number_input(f"{subject} (Max {curriculum.max_marks}):", min_value=0, max_value=curriculum.max_marks, value=None,
+                            key=f"whatif_{semester}_{subject}")
+            for subject in curriculum.semesters[semester]
+        )
+        target = st.slider("Target percentage:", min_value=0, max_value=100, value=60, key="whatif_target")
+        outcome = simulate(semester, known, float(target), curriculum)
+
+        if not outcome["can_pass"]:
+            st.error(f"Already below the pass mark in: {', '.join(outcome['failed_subjects'])}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Lowest Possible", f"{outcome['min_percentage']:.1f}%")
+        with col2:
+            st.metric("Highest Possible", f"{outcome['max_percentage']:.1f}%")
+
+        if outcome["remaining_subjects"] and outcome["can_pass"]:
+            if outcome["target_reachable"]:
+                st.success(f"To reach {target}% you need at least {outcome['min_for_target_even']}/{curriculum.max_marks} in each remaining subject "
+                           f"(or {outcome['min_for_target_single']}/{curriculum.max_marks} in one if you score full marks in the others).")
+            else:
+                st.warning(f"{target}% is out of reach; the most you can get is {outcome['max_percentage']:.1f}%.")
+            st.dataframe(pd.DataFrame({
+                "Subject": outcome["remaining_subjects"],
+                "Min to Pass": [outcome["min_to_pass"][subject] for subject in outcome["remaining_subjects"]],
+            }), hide_index=True)
+            st.line_chart(pd.DataFrame({
+                "Mark in each remaining subject": outcome["uniform_marks"],
+                "Percentage": outcome["uniform_percentage"],
+            }).set_index("Mark in each remaining subject"))
+        elif outcome["can_pass"] and not outcome["remaining_subjects"]:
+            st.info(f"All marks are in: {outcome['min_percentage']:.1f}%.")
+
+# Time each full rerun, including reruns ended early by st.rerun() or st.stop();
+# fragments rerunning on their own are timed as kind "fragment"
+with METRICS.rerun():
+    main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from metrics import count
+
+# Define static folders
+BASE_DIR = Path(__file__).resolve().parent
+STATIC_DIR = Path("static/data/previous_papers")
+SYLLABUS_DIR = Path("static/data/syllabus")
+IMAGE_DIR = Path("static/images")
+
+# Folders searched for each kind of asset, in priority order
+ASSET_ROOTS = {
+    "papers": [STATIC_DIR],
+    "syllabus": [SYLLABUS_DIR, BASE_DIR / "Syllabus"],
+    "images": [IMAGE_DIR, BASE_DIR / "images"],
+}
+
+# Image files (updated to .jpg)
+IMAGE_FILES = {
+    "tracking": "tracking.jpg",
+    "papers": "papers.jpg",
+    "register": "register.jpg",
+    "certificate": "certificate.jpg",
+    "pen_paper": "pen_paper.jpg",
+    "books": "books.jpg",
+    "bulb": "bulb.jpg",
+    "question_papers": "question_papers.jpg",
+    "syllabus": "syllabus.jpg",
+}
+
+# Upper bound on cached file bytes
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Seconds between checks of the asset folders for added, removed or modified files
+WATCH_INTERVAL = 5.0
+
+
+# Solid-colour PNG generated in memory, used when an image file is missing
+def placeholder_png(width, height=None, color=(220, 220, 235)):
+    height = height or width
+    row = b"\x00" + bytes(color) * width
+    raw = zlib.compress(row * height)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", raw) + chunk(b"IEND", b"")
+
+
+# Manifest of the asset folders plus a size-bounded LRU cache of file bytes.
+# Lookups are case-insensitive and never touch the disk between rescans.
+class AssetLibrary:
+    def __init__(self, roots=None, max_bytes=CACHE_MAX_BYTES, watch_interval=WATCH_INTERVAL):
+        self.roots = roots or ASSET_ROOTS
+        self.max_bytes = max_bytes
+        self.watch_interval = watch_interval
+        self.lock = threading.RLock()
+        self.manifest = {}
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.placeholders = {}
+        self.scanned_at = 0.0
+        self.scan()
+
+    # Rebuild the manifest: {kind: {lowercase file name: (path, mtime, size)}}
+    def scan(self):
+        manifest = {}
+        for kind, roots in self.roots.items():
+            files = {}
+            for root in reversed(roots):
+                if not Path(root).is_dir():
+                    continue
+                for path in Path(root).iterdir():
+                    if path.is_file():
+                        stat = path.stat()
+                        files[path.name.lower()] = (path, stat.st_mtime_ns, stat.st_size)
+            manifest[kind] = files
+
+        with self.lock:
+            # Drop cached bytes for files that changed or disappeared
+            current = {entry[0]: entry for files in manifest.values() for entry in files.values()}
+            for path in list(self.cache):
+                entry = current.get(path)
+                if entry is None or entry[1:] != self.cache[path][0]:
+                    self.cached_bytes -= len(self.cache.pop(path)[1])
+            self.manifest = manifest
+            self.scanned_at = time.monotonic()
+
+    def _refresh(self):
+        if time.monotonic() - self.scanned_at >= self.watch_interval:
+            self.scan()
+
+    # Path of an asset by file name, or None if it is not present
+    def find(self, kind, filename):
+        self._refresh()
+        entry = self.manifest.get(kind, {}).get(filename.lower())
+        return entry[0] if entry else None
+
+    # Bytes of an asset, served from the cache when warm; None if not present
+    def read(self, kind, filename):
+        self._refresh()
+        entry = self.manifest.get(kind, {}).get(filename.lower())
+        if entry is None:
+            return None
+        path, mtime, size = entry
+
+        with self.lock:
+            cached = self.cache.get(path)
+            if cached is not None:
+                self.cache.move_to_end(path)
+                self.hits += 1
+                count("asset_cache_hits_total")
+                return cached[1]
+            self.misses += 1
+            count("asset_cache_misses_total")
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        count("file_bytes_read_total", len(data))
+
+        with self.lock:
+            if len(data) <= self.max_bytes and path not in self.cache:
+                self.cache[path] = ((mtime, size), data)
+                self.cached_bytes += len(data)
+                while self.cached_bytes > self.max_bytes:
+                    _, (_, evicted) = self.cache.popitem(last=False)
+                    self.cached_bytes -= len(evicted)
+        return data
+
+    # Bytes for one of IMAGE_FILES, falling back to a generated placeholder
+    def image(self, image_key, width=50):
+        data = self.read("images", IMAGE_FILES[image_key])
+        if data is not None:
+            return data
+        with self.lock:
+            if width not in self.placeholders:
+                self.placeholders[width] = placeholder_png(width)
+            return self.placeholders[width]
+
+    # Previous question papers, e.g. "C_Programming.pdf"
+    def paper(self, filename):
+        return self.read("papers", filename)
+
+    def syllabus(self, filename):
+        return self.read("syllabus", filename)
@@ -0,0 +1,75 @@
+# Throughput benchmark for the headless API.
+#
+#   python benchmarks/api_throughput.py                 # in-process, no server needed
+#   python benchmarks/api_throughput.py --url http://127.0.0.1:8000
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from subjects import SEMESTER_SUBJECTS, MAX_MARKS
+from predictor import SEED
+
+
+def make_records(semester, count, seed=SEED):
+    rng = np.random.default_rng(seed)
+    marks = rng.integers(0, MAX_MARKS + 1, size=(count, len(SEMESTER_SUBJECTS[semester])))
+    records = [dict(zip(SEMESTER_SUBJECTS[semester], row)) for row in marks.tolist()]
+    for index, record in enumerate(records):
+        record.update({"Student ID": f"S{index:06d}", "Attendance": 80, "Assignments": 7, "Participation": 6})
+    return records
+
+
+async def run(client, semester, batch_size, batches, concurrency, singles):
+    records = make_records(semester, batch_size)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def post(path, payload):
+        async with limit:
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post("/evaluate/batch", {"semester": semester, "students": records}) for _ in range(batches)))
+    elapsed = time.perf_counter() - start
+    print(f"batch:  {batches} x {batch_size} records in {elapsed:.2f}s -> {batches * batch_size / elapsed:,.0f} records/s")
+
+    single = {"semester": semester, "marks": {k: v for k, v in records[0].items() if k != "Student ID"}}
+    start = time.perf_counter()
+    await asyncio.gather(*(post("/evaluate", single) for _ in range(singles)))
+    elapsed = time.perf_counter() - start
+    print(f"single: {singles} requests in {elapsed:.2f}s -> {singles / elapsed:,.0f} requests/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the headless API throughput")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--semester", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--batches", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--singles", type=int, default=500)
+    args = parser.parse_args()
+    options = (args.semester, args.batch_size, args.batches, args.concurrency, args.singles)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+            await run(client, *options)
+        return
+
+    from api import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=None) as client:
+            await run(client, *options)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+# Reproducible benchmark suite for the grading, summary, recommendation,
+# transcript and cold-start paths, seeded from predictor.SEED.
+#
+#   python benchmarks/run_benchmarks.py                       # run and save results
+#   python benchmarks/run_benchmarks.py --compare OLD.json    # also flag regressions
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from assets import AssetLibrary
+from subjects import SEMESTER_SUBJECTS, MAX_MARKS, COMMON_FIELDS
+from grading import grade_semester, summary_frame
+from predictor import N_SAMPLES, SEED
+from recommendations import SUBJECT_BUNDLES, gather_recommendations, study_plans
+from search import SyllabusIndex
+from transcripts import TRANSCRIPT_BATCH, render_batch
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# A benchmark is flagged when its median is this many times slower than the baseline
+REGRESSION_THRESHOLD = 1.2
+
+
+def measure(function, repeats):
+    function()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeats": repeats,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+    }
+
+
+def random_marks(students, semester, rng):
+    return rng.integers(0, MAX_MARKS + 1, size=(students, len(SEMESTER_SUBJECTS[semester])))
+
+
+def random_performance(rng):
+    performance_data = {}
+    for semester, subjects in SEMESTER_SUBJECTS.items():
+        data = dict(zip(subjects, rng.integers(0, MAX_MARKS + 1, size=len(subjects)).tolist()))
+        data.update({field: int(rng.integers(0, top + 1)) for field, top in COMMON_FIELDS.items()})
+        performance_data[semester] = data
+    return performance_data
+
+
+def bench_grading(results, repeats):
+    rng = np.random.default_rng(SEED)
+    for students in (1, N_SAMPLES, 1_000_000):
+        marks = random_marks(students, 1, rng)
+        results[f"grading/{students}"] = measure(lambda: grade_semester(marks, 1), max(1, repeats if students < 1_000_000 else repeats // 5))
+
+
+def bench_summary(results, repeats, students):
+    rng = np.random.default_rng(SEED)
+    cohort = [random_performance(rng) for _ in range(students)]
+
+    def build():
+        return [summary_frame(performance_data) for performance_data in cohort]
+
+    def render():
+        for frame in build():
+            frame.style.highlight_max(axis=0, subset=["Percentage"]).to_html()
+
+    results[f"summary/build/{students}x6"] = measure(build, repeats)
+    results[f"summary/render/{students}x6"] = measure(render, max(1, repeats // 2))
+
+
+# What the app does for a failed semester: bundles, past paper and syllabus
+# reads through the asset cache, and the best syllabus unit of every topic.
+# The index is built in a temporary file before timing starts.
+def bench_recommendations(results, repeats):
+    rng = np.random.default_rng(SEED)
+    assets = AssetLibrary()
+    with tempfile.TemporaryDirectory() as workdir:
+        index = SyllabusIndex(Path(workdir) / "syllabus_index.json").open()
+    for name, subjects in (("semester_1", SEMESTER_SUBJECTS[1]), ("all_subjects", list(SUBJECT_BUNDLES))):
+        results[f"recommendations/assemble/{name}"] = measure(
+            lambda: gather_recommendations(subjects, assets, index), repeats * 10
+        )
+
+    failed = random_marks(N_SAMPLES, 1, rng) < 30
+    results[f"recommendations/study_plans/{N_SAMPLES}"] = measure(lambda: study_plans(failed, 1), repeats)
+
+
+# Rendering cost of one worker task's batch of transcripts
+def bench_transcripts(results, repeats):
+    rng = np.random.default_rng(SEED)
+    batch = [(f"S{i:05d}", random_performance(rng)) for i in range(TRANSCRIPT_BATCH)]
+    results[f"transcripts/render_batch/{TRANSCRIPT_BATCH}"] = measure(lambda: render_batch(batch), repeats)
+
+
+# Import and first render of app.py in a fresh interpreter and an empty working
+# directory, so nothing is warm: no cached modules, models or database
+COLD_START = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+AppTest.from_file({app!r}, default_timeout=300).run()
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def bench_cold_start(results, repeats):
+    imports, renders = [], []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, PERFORMANCE_DB=str(Path(workdir) / "performance.db"),
+                       SYLLABUS_INDEX=str(Path(workdir) / "syllabus_index.json"))
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_START.format(app=str(ROOT / "app.py"))],
+                cwd=workdir, env=env, capture_output=True, text=True, check=True,
+            ).stdout.split()
+        imports.append(float(output[-2]))
+        renders.append(float(output[-1]))
+    for name, timings in (("cold_start/import", imports), ("cold_start/first_render", renders)):
+        results[name] = {
+            "repeats": repeats,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Benchmarks whose median got slower than `threshold` times the baseline
+def regressions(current, baseline, threshold=REGRESSION_THRESHOLD):
+    flagged = []
+    for name, timing in current["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous and timing["median"] > previous["median"] * threshold:
+            flagged.append((name, previous["median"], timing["median"]))
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save the results as JSON")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--summary-students", type=int, default=200)
+    parser.add_argument("--skip-cold-start", action="store_true")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="baseline results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    benchmarks = {}
+    bench_grading(benchmarks, args.repeats)
+    bench_summary(benchmarks, args.repeats, args.summary_students)
+    bench_recommendations(benchmarks, args.repeats)
+    bench_transcripts(benchmarks, args.repeats)
+    if not args.skip_cold_start:
+        bench_cold_start(benchmarks, max(1, args.repeats // 2))
+
+    now = datetime.now(timezone.utc)
+    current = {
+        "timestamp": now.isoformat(),
+        "commit": git_commit(),
+        "seed": SEED,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "benchmarks": benchmarks,
+    }
+    output = args.output or RESULTS_DIR / f"{now:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2))
+
+    for name, timing in benchmarks.items():
+        print(f"{name:40s} median {timing['median'] * 1000:10.3f} ms  min {timing['min'] * 1000:10.3f} ms")
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        flagged = regressions(current, json.loads(args.compare.read_text()), args.threshold)
+        for name, before, after in flagged:
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        if flagged:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
+# Versioned curriculum files, one programme (or regulation year) per JSON file
+CURRICULUM_DIR = Path(os.environ.get("CURRICULUM_DIR", Path(__file__).resolve().parent / "curricula"))
+# Curriculum used when none is chosen
+DEFAULT_CURRICULUM = os.environ.get("DEFAULT_CURRICULUM", "bsc-data-science")
+# File layout understood by this loader
+FORMAT_VERSION = 1
+
+# One subject of a curriculum with its recommendation links
+Subject = namedtuple("Subject", ["name", "semester", "credits", "book", "topics", "syllabus_file"])
+
+
+# A compiled curriculum. `semesters` maps each semester to its subject names
+# in mark-sheet order and `subjects` maps a subject name to its Subject; both
+# are read-only and shared by every session in the process.
+class Curriculum(namedtuple("Curriculum", ["id", "name", "version", "max_marks", "pass_mark", "semesters", "subjects"])):
+    __slots__ = ()
+
+    # Hashable so it can key memoized results; a process compiles each id once
+    def __hash__(self):
+        return hash((self.id, self.version))
+
+
+def _fail(path, message):
+    raise ValueError(f"Invalid curriculum {path.name}: {message}")
+
+
+def _optional_text(value):
+    return value is None or (isinstance(value, str) and value.strip() != "")
+
+
+# Validate one curriculum document and compile it into a Curriculum
+def compile_curriculum(document, path):
+    if not isinstance(document, dict):
+        _fail(path, "expected a JSON object")
+    if document.get("format") != FORMAT_VERSION:
+        _fail(path, f"unsupported format {document.get('format')!r}, expected {FORMAT_VERSION}")
+    for key in ("id", "name"):
+        if not isinstance(document.get(key), str) or not document[key].strip():
+            _fail(path, f"'{key}' must be a non-empty string")
+    if not isinstance(document.get("version"), int):
+        _fail(path, "'version' must be an integer")
+
+    max_marks, pass_mark = document.get("max_marks"), document.get("pass_mark")
+    if not isinstance(max_marks, int) or max_marks <= 0:
+        _fail(path, "'max_marks' must be a positive integer")
+    if not isinstance(pass_mark, int) or not 0 <= pass_mark <= max_marks:
+        _fail(path, f"'pass_mark' must be an integer between 0 and {max_marks}")
+
+    semesters = document.get("semesters")
+    if not isinstance(semesters, dict) or not semesters:
+        _fail(path, "'semesters' must map semester numbers to subject lists")
+
+    subject_names = {}
+    subjects = {}
+    for key, entries in semesters.items():
+        if not key.isdigit() or int(key) < 1:
+            _fail(path, f"semester {key!r} is not a positive number")
+        semester = int(key)
+        if not isinstance(entries, list) or not entries:
+            _fail(path, f"semester {semester} has no subjects")
+        names = []
+        for entry in entries:
+            name = entry.get("name") if isinstance(entry, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                _fail(path, f"semester {semester} has a subject without a name")
+            if name in subjects:
+                _fail(path, f"subject {name!r} is listed more than once")
+            credits = entry.get("credits")
+            if credits is not None and (not isinstance(credits, int) or credits < 0):
+                _fail(path, f"{name}: 'credits' must be a non-negative integer or null")
+            topics = entry.get("topics", [])
+            if not isinstance(topics, list) or not all(isinstance(topic, str) and topic.strip() for topic in topics):
+                _fail(path, f"{name}: 'topics' must be a list of strings")
+            if not _optional_text(entry.get("book")) or not _optional_text(entry.get("syllabus")):
+                _fail(path, f"{name}: 'book' and 'syllabus' must be strings or null")
+            subjects[name] = Subject(name, semester, credits, entry.get("book"),
+                                     tuple(topic.strip() for topic in topics), entry.get("syllabus"))
+            names.append(name)
+        subject_names[semester] = tuple(names)
+
+    return Curriculum(
+        id=document["id"],
+        name=document["name"],
+        version=document["version"],
+        max_marks=max_marks,
+        pass_mark=pass_mark,
+        semesters=MappingProxyType(dict(sorted(subject_names.items()))),
+        subjects=MappingProxyType(subjects),
+    )
+
+
+# Every curriculum in CURRICULUM_DIR, read and validated once per process
+@lru_cache(maxsize=1)
+def load_curricula(directory=CURRICULUM_DIR):
+    curricula = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        with open(path, encoding="utf-8") as file:
+            try:
+                document = json.load(file)
+            except json.JSONDecodeError as exc:
+                _fail(path, str(exc))
+        curriculum = compile_curriculum(document, path)
+        if curriculum.id in curricula:
+            _fail(path, f"duplicate curriculum id {curriculum.id!r}")
+        curricula[curriculum.id] = curriculum
+    if not curricula:
+        raise ValueError(f"No curriculum files found in {directory}")
+    return MappingProxyType(curricula)
+
+
+# Resolve a Curriculum, a curriculum id or None (the default curriculum)
+def get_curriculum(curriculum=None):
+    if isinstance(curriculum, Curriculum):
+        return curriculum
+    curricula = load_curricula()
+    curriculum_id = DEFAULT_CURRICULUM if curriculum is None else curriculum
+    if curriculum_id not in curricula:
+        raise KeyError(f"Unknown curriculum {curriculum_id!r}")
+    return curricula[curriculum_id]
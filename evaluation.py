@@ -0,0 +1,79 @@
+import pandas as pd
+
+from curriculum import get_curriculum
+from grading import grade_cohort, grade_student
+from importer import STUDENT_ID_COLUMN, validate_chunk
+from predictor import predict_proba
+from recommendations import subject_bundles
+
+
+# Recommendations for failed subjects as plain dicts
+def recommendations_for(subjects, curriculum=None):
+    return [
+        {"subject": bundle.subject, "book": bundle.book, "topics": list(bundle.topics),
+         "syllabus_file": bundle.syllabus_file, "paper_file": bundle.paper_file}
+        for bundle in subject_bundles(subjects, curriculum)
+    ]
+
+
+# Grade one student's semester, add the model's pass probability and the
+# recommendations for any failed subject. Used by the app and the API; `models`
+# must come from load_models() for the same curriculum.
+def evaluate_student(student_data, semester, models, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    result = grade_student(student_data, semester, curriculum)
+    result["pass_probability"] = float(predict_proba(models, semester, student_data)[0])
+    result["recommendations"] = recommendations_for(result["failed_subjects"], curriculum)
+    return result
+
+
+# Evaluate a cohort for one semester in one vectorized pass. Rows with missing
+# or out-of-range values are reported in `errors` instead of being graded.
+def evaluate_batch(records, semester, models, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    subjects = curriculum.semesters[semester]
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+    if df.empty:
+        return {"semester": semester, "results": [], "errors": []}
+    missing = [subject for subject in subjects if subject not in df.columns]
+    if missing:
+        raise ValueError(f"Records are missing Semester {semester} subjects: {', '.join(missing)}")
+
+    # Records are evaluated whether or not they carry a Student ID
+    valid, errors = validate_chunk(df, semester, curriculum, ids_required=False)
+    rows = df[valid]
+    numeric = rows.drop(columns=[STUDENT_ID_COLUMN], errors="ignore").apply(pd.to_numeric, errors="coerce")
+    graded = grade_cohort(numeric, semester, curriculum)
+
+    failed = graded[[f"Failed {subject}" for subject in subjects]].to_numpy()
+    probabilities = predict_proba(models, semester, numeric) if len(rows) else []
+    if STUDENT_ID_COLUMN in rows.columns:
+        # Records without an id come back as None rather than NaN, which is not valid JSON
+        ids = rows[STUDENT_ID_COLUMN].astype(object)
+        student_ids = ids.where(ids.notna(), None).tolist()
+    else:
+        student_ids = [None] * len(rows)
+
+    results = [
+        {
+            "row": int(row),
+            "student_id": student_id,
+            "total_marks": float(total),
+            "percentage": float(percentage),
+            "passed": bool(passed),
+            "pass_probability": float(probability),
+            "failed_subjects": [subject for subject, flag in zip(subjects, flags) if flag],
+        }
+        for row, student_id, total, percentage, passed, probability, flags in zip(
+            graded.index, student_ids, graded["Total Marks"], graded["Percentage"],
+            graded["Passed"], probabilities, failed
+        )
+    ]
+    return {
+        "semester": semester,
+        "results": results,
+        "errors": [
+            {"row": int(row), "column": column, "value": None if pd.isna(value) else getattr(value, "item", lambda: value)()}
+            for row, column, value in errors.itertuples(index=False, name=None)
+        ],
+    }
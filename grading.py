@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from subjects import COMMON_FIELDS
+from curriculum import get_curriculum
+
+# Per-semester grades for a cohort; every field holds one row per student
+SemesterGrades = namedtuple(
+    "SemesterGrades",
+    ["semester", "subjects", "marks", "failed", "passed", "total", "average", "percentage", "max_possible"],
+)
+
+
+# Convert a cohort into a students x subjects marks matrix, in the curriculum's
+# subject order. Accepts a DataFrame with one column per subject (extra columns
+# such as Attendance are ignored), a 2-D array, or a single row of marks.
+def marks_matrix(data, semester, curriculum=None):
+    subjects = list(get_curriculum(curriculum).semesters[semester])
+    if isinstance(data, pd.DataFrame):
+        missing = [subject for subject in subjects if subject not in data.columns]
+        if missing:
+            raise KeyError(f"Semester {semester} marks are missing columns: {', '.join(missing)}")
+        return data[subjects].to_numpy()
+
+    marks = np.asarray(data)
+    if marks.ndim == 1:
+        marks = marks.reshape(1, -1)
+    if marks.ndim != 2 or marks.shape[1] != len(subjects):
+        raise ValueError(f"Semester {semester} expects {len(subjects)} subject columns, got shape {marks.shape}")
+    return marks
+
+
+# Grade a whole cohort for one semester in a single vectorized pass
+def grade_semester(data, semester, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    subjects = curriculum.semesters[semester]
+    marks = marks_matrix(data, semester, curriculum)
+    max_possible = curriculum.max_marks * len(subjects)
+
+    failed = marks < curriculum.pass_mark
+    total = marks.sum(axis=1)
+    return SemesterGrades(
+        semester=semester,
+        subjects=subjects,
+        marks=marks,
+        failed=failed,
+        passed=~failed.any(axis=1),
+        total=total,
+        average=total / len(subjects),
+        percentage=(total / max_possible) * 100,
+        max_possible=max_possible,
+    )
+
+
+# Flatten grades into a DataFrame: metrics, pass status and one failed-flag column per subject
+def grades_frame(grades, index=None):
+    frame = pd.DataFrame(
+        {
+            "Semester": grades.semester,
+            "Total Marks": grades.total,
+            "Max Marks": grades.max_possible,
+            "Average Score": grades.average,
+            "Percentage": grades.percentage,
+            "Passed": grades.passed,
+        },
+        index=index,
+    )
+    failed = pd.DataFrame(grades.failed, columns=[f"Failed {subject}" for subject in grades.subjects], index=frame.index)
+    return pd.concat([frame, failed], axis=1)
+
+
+# Grade a cohort DataFrame, keeping its index and any common inputs it carries
+def grade_cohort(df, semester, curriculum=None):
+    frame = grades_frame(grade_semester(df, semester, curriculum), index=df.index)
+    common = [field for field in COMMON_FIELDS if field in df.columns]
+    if common:
+        frame = pd.concat([df[common], frame], axis=1)
+    return frame
+
+
+# Grade one student's inputs as entered in a semester tab
+def grade_student(student_data, semester, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    grades = grade_semester([student_data[subject] for subject in curriculum.semesters[semester]], semester, curriculum)
+    return {
+        "total_marks": grades.total[0].item(),
+        "max_possible": grades.max_possible,
+        "avg_score": grades.average[0].item(),
+        "performance_percentage": grades.percentage[0].item(),
+        "pass_status": int(grades.passed[0]),
+        "failed_subjects": [subject for subject, failed in zip(grades.subjects, grades.failed[0]) if failed],
+    }
+
+
+# Build the "Overall Performance Summary" rows from per-semester student data
+def summary_frame(performance_data, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    summary_data = []
+    for semester, data in sorted(performance_data.items()):
+        result = grade_student(data, semester, curriculum)
+        summary_data.append({
+            "Semester": semester,
+            "Total Marks": f"{result['total_marks']}/{result['max_possible']}",
+            "Percentage": f"{result['performance_percentage']:.1f}%",
+            "Status": "Pass" if result["pass_status"] == 1 else "Needs Improvement"
+        })
+    return pd.DataFrame(summary_data)
@@ -0,0 +1,199 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from subjects import COMMON_FIELDS
+from curriculum import get_curriculum
+from grading import grade_cohort
+
+# Rows read per chunk; keeps memory bounded regardless of sheet size
+CHUNK_SIZE = 50_000
+# Column identifying a student in a mark sheet, if present
+STUDENT_ID_COLUMN = "Student ID"
+# Invalid cells kept for reporting; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+# Server directory mark sheets may be imported from by name; unset disables
+# server-side imports so browser users cannot read arbitrary paths or URLs
+IMPORT_DIR = os.environ.get("IMPORT_DIR")
+
+
+# Columns of a semester mark sheet with their allowed (min, max) values
+def sheet_bounds(semester, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    bounds = {subject: (0, curriculum.max_marks) for subject in curriculum.semesters[semester]}
+    bounds.update({field: (0, max_value) for field, max_value in COMMON_FIELDS.items()})
+    return bounds
+
+
+# Resolve a user-supplied mark sheet name to a file inside `import_dir`
+def resolve_import_path(name, import_dir=IMPORT_DIR):
+    if not import_dir:
+        raise ValueError("Server-side imports are disabled; set IMPORT_DIR to enable them")
+    if "://" in name:
+        raise ValueError("URLs are not accepted; give a file name inside the import directory")
+    root = Path(import_dir).resolve()
+    path = (root / name).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"{name} is outside the import directory")
+    if not path.is_file():
+        raise ValueError(f"No mark sheet named {name} in the import directory")
+    return path
+
+
+def _source_name(source):
+    return str(getattr(source, "name", source))
+
+
+def _is_parquet(source):
+    return Path(_source_name(source)).suffix.lower() in (".parquet", ".pq")
+
+
+# Student ids as stripped text, with blank cells as None. Whole numbers read
+# into a float column (e.g. an id column with gaps) lose their ".0", so they
+# match the ids typed in the app.
+def _student_id(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def clean_student_ids(ids):
+    return ids.map(_student_id).astype(object)
+
+
+def _check_columns(columns, semester, curriculum):
+    missing = [subject for subject in curriculum.semesters[semester] if subject not in columns]
+    if missing:
+        raise ValueError(f"Mark sheet is missing Semester {semester} subjects: {', '.join(missing)}")
+
+
+# Stream a CSV or Parquet mark sheet in fixed-size chunks, reading only the
+# columns the semester needs
+def iter_mark_sheet(source, semester, chunk_size=CHUNK_SIZE, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    wanted = set(sheet_bounds(semester, curriculum)) | {STUDENT_ID_COLUMN}
+
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        columns = [name for name in parquet_file.schema_arrow.names if name in wanted]
+        _check_columns(columns, semester, curriculum)
+        offset = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            if STUDENT_ID_COLUMN in chunk.columns:
+                chunk[STUDENT_ID_COLUMN] = clean_student_ids(chunk[STUDENT_ID_COLUMN])
+            yield chunk
+        return
+
+    reader = pd.read_csv(source, usecols=lambda name: name in wanted, chunksize=chunk_size,
+                         dtype={STUDENT_ID_COLUMN: str})
+    for chunk in reader:
+        _check_columns(chunk.columns, semester, curriculum)
+        if STUDENT_ID_COLUMN in chunk.columns:
+            chunk[STUDENT_ID_COLUMN] = clean_student_ids(chunk[STUDENT_ID_COLUMN])
+        yield chunk
+
+
+def _numeric(frame):
+    return frame.apply(pd.to_numeric, errors="coerce")
+
+
+# Vectorized range check for a chunk. Subject marks are required; the common
+# inputs are optional and only range-checked where present. A blank Student ID
+# is an error too unless `ids_required` is false. Returns a boolean mask of
+# valid rows and a Row/Column/Value frame of the offending cells.
+def validate_chunk(chunk, semester, curriculum=None, ids_required=True):
+    curriculum = get_curriculum(curriculum)
+    bounds = sheet_bounds(semester, curriculum)
+    columns = [column for column in bounds if column in chunk.columns]
+    low = np.array([bounds[column][0] for column in columns], dtype=float)
+    high = np.array([bounds[column][1] for column in columns], dtype=float)
+    required = np.array([column in curriculum.semesters[semester] for column in columns])
+
+    values = _numeric(chunk[columns]).to_numpy(dtype=float)
+    bad = (np.isnan(values) & required) | (values < low) | (values > high)
+    checked = chunk[columns]
+    if ids_required and STUDENT_ID_COLUMN in chunk.columns:
+        columns = [STUDENT_ID_COLUMN] + columns
+        bad = np.hstack([chunk[[STUDENT_ID_COLUMN]].isna().to_numpy(), bad])
+        checked = chunk[columns]
+    rows, cols = np.nonzero(bad)
+    errors = pd.DataFrame({
+        "Row": chunk.index.to_numpy()[rows],
+        "Column": np.asarray(columns, dtype=object)[cols],
+        "Value": checked.to_numpy(dtype=object)[rows, cols],
+    })
+    return ~bad.any(axis=1), errors
+
+
+# Running totals for an imported cohort; only aggregates are kept, so memory
+# does not grow with the size of the sheet
+class CohortImport:
+    def __init__(self, semester, curriculum=None):
+        self.semester = semester
+        self.curriculum = get_curriculum(curriculum)
+        self.rows_read = 0
+        self.rows_invalid = 0
+        self.error_count = 0
+        self.errors = []
+        self.students = 0
+        self.passed = 0
+        self.percentage_sum = 0.0
+        self.failed_counts = pd.Series(0, index=list(self.curriculum.semesters[semester]))
+
+    def add(self, chunk):
+        valid, errors = validate_chunk(chunk, self.semester, self.curriculum)
+        self.rows_read += len(chunk)
+        self.rows_invalid += int((~valid).sum())
+        self.error_count += len(errors)
+        room = MAX_REPORTED_ERRORS - sum(len(e) for e in self.errors)
+        if room > 0 and len(errors):
+            self.errors.append(errors.head(room))
+
+        rows = chunk[valid]
+        columns = [column for column in sheet_bounds(self.semester, self.curriculum) if column in rows.columns]
+        graded = grade_cohort(_numeric(rows[columns]), self.semester, self.curriculum)
+        if STUDENT_ID_COLUMN in rows.columns:
+            graded.insert(0, STUDENT_ID_COLUMN, rows[STUDENT_ID_COLUMN])
+        self.students += len(graded)
+        self.passed += int(graded["Passed"].sum())
+        self.percentage_sum += float(graded["Percentage"].sum())
+        failed_columns = [f"Failed {subject}" for subject in self.curriculum.semesters[self.semester]]
+        self.failed_counts += graded[failed_columns].sum().to_numpy()
+        return graded
+
+    def error_frame(self):
+        if not self.errors:
+            return pd.DataFrame(columns=["Row", "Column", "Value"])
+        return pd.concat(self.errors, ignore_index=True)
+
+    def summary(self):
+        return {
+            "Semester": self.semester,
+            "Students": self.students,
+            "Passed": self.passed,
+            "Pass Rate": f"{(self.passed / self.students * 100) if self.students else 0:.1f}%",
+            "Average Percentage": f"{(self.percentage_sum / self.students) if self.students else 0:.1f}%",
+            "Rejected Rows": self.rows_invalid,
+        }
+
+
+# Import a whole mark sheet chunk by chunk. `on_chunk` receives each graded
+# chunk, e.g. to write results out, and `on_progress` the rows read so far.
+def import_mark_sheet(source, semester, chunk_size=CHUNK_SIZE, on_chunk=None, on_progress=None, curriculum=None):
+    cohort = CohortImport(semester, curriculum)
+    for chunk in iter_mark_sheet(source, semester, chunk_size=chunk_size, curriculum=cohort.curriculum):
+        graded = cohort.add(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk, graded)
+        if on_progress is not None:
+            on_progress(cohort.rows_read)
+    return cohort
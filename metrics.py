@@ -0,0 +1,144 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Optional exports, enabled by environment variables:
+#   METRICS_LOG      append one JSON line per rerun with its span timings
+#   METRICS_PROM     rewrite this file with Prometheus text after each rerun
+#   PROFILE_RERUNS   "1" to capture a cProfile of every rerun into PROFILE_DIR
+METRICS_LOG = os.environ.get("METRICS_LOG")
+METRICS_PROM = os.environ.get("METRICS_PROM")
+PROFILE_RERUNS = os.environ.get("PROFILE_RERUNS") == "1"
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "profiles"))
+
+# Samples kept per span for percentiles
+SPAN_WINDOW = 2048
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+# Process-wide counters and span timings, safe to use from every session thread
+class Metrics:
+    def __init__(self, window=SPAN_WINDOW):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.span_counts = defaultdict(int)
+        self.span_sums = defaultdict(float)
+        self.span_samples = defaultdict(lambda: deque(maxlen=window))
+        self.local = threading.local()
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            self.span_counts[name] += 1
+            self.span_sums[name] += seconds
+            self.span_samples[name].append(seconds)
+        current = getattr(self.local, "rerun", None)
+        if current is not None:
+            current["spans"][name] = current["spans"].get(name, 0.0) + seconds
+
+    # Time a named section; nested and repeated spans are all recorded
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # Mark the start of a script rerun on this thread. An unfinished previous
+    # rerun (e.g. interrupted by st.rerun) is closed first.
+    def start_rerun(self, kind="rerun"):
+        if getattr(self.local, "rerun", None) is not None:
+            self.finish_rerun()
+        self.count(f"{kind}s_total")
+        profiler = None
+        if PROFILE_RERUNS:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active on this thread
+                profiler = None
+        self.local.rerun = {"kind": kind, "start": time.perf_counter(), "spans": {}, "profiler": profiler}
+
+    def finish_rerun(self):
+        current = getattr(self.local, "rerun", None)
+        if current is None:
+            return
+        self.local.rerun = None
+        elapsed = time.perf_counter() - current["start"]
+        self.observe(current["kind"], elapsed)
+
+        if current["profiler"] is not None:
+            current["profiler"].disable()
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            current["profiler"].dump_stats(PROFILE_DIR / f"{current['kind']}-{time.time_ns()}.prof")
+        if METRICS_LOG:
+            record = {"ts": time.time(), "kind": current["kind"], "seconds": elapsed, "spans": current["spans"]}
+            with self.lock, open(METRICS_LOG, "a", encoding="utf-8") as log:
+                log.write(json.dumps(record) + "\n")
+        if METRICS_PROM:
+            self.write_prometheus(METRICS_PROM)
+
+    # Time everything inside as one rerun of `kind`, finished even when
+    # st.rerun() or st.stop() raises out of it. Also usable as a decorator, e.g.
+    # on fragments with kind "fragment": when a rerun is already being timed on
+    # this thread (a fragment drawn by a full rerun), the body is part of it.
+    @contextmanager
+    def rerun(self, kind="rerun"):
+        if getattr(self.local, "rerun", None) is not None:
+            yield
+            return
+        self.start_rerun(kind)
+        try:
+            yield
+        finally:
+            self.finish_rerun()
+
+    # Point-in-time copy: counters plus count/sum/quantiles per span
+    def snapshot(self):
+        with self.lock:
+            spans = {}
+            for name, samples in self.span_samples.items():
+                ordered = sorted(samples)
+                spans[name] = {
+                    "count": self.span_counts[name],
+                    "sum": self.span_sums[name],
+                    "quantiles": {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES},
+                }
+            return {"counters": dict(self.counters), "spans": spans}
+
+    # Metrics in the Prometheus text exposition format
+    def prometheus_text(self, prefix="student_app"):
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}_{name}"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        metric = f"{prefix}_span_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for name, span in sorted(snapshot["spans"].items()):
+            for q, value in span["quantiles"].items():
+                lines.append(f'{metric}{{span="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {span["sum"]:.6f}')
+            lines.append(f'{metric}_count{{span="{name}"}} {span["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        path = Path(path)
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(temporary, path)
+
+
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from subjects import COMMON_FIELDS
+from curriculum import get_curriculum
+from grading import marks_matrix
+
+# Constants
+N_SAMPLES = 10000
+PASS_THRESHOLD = 50
+SEED = 42
+
+# Where fitted models are persisted, one directory per curriculum and one file per semester
+MODEL_DIR = Path("models")
+# Marks scale the synthetic cohort generator was calibrated for
+GENERATOR_MAX_MARKS = 60
+# Typical common inputs of the training cohort (the generator's means), used
+# for a student who leaves one out; a zero would read as a disengaged student
+TYPICAL_COMMON = {"Attendance": 75, "Assignments": 6, "Participation": 5}
+
+
+# Feature columns for a semester: subject marks followed by the common inputs
+def feature_columns(semester, curriculum=None):
+    return list(get_curriculum(curriculum).semesters[semester]) + list(COMMON_FIELDS)
+
+
+# Students x features matrix from a DataFrame, a list of per-student dicts or a
+# single dict. Missing common inputs take their TYPICAL_COMMON value.
+def feature_matrix(data, semester, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    if isinstance(data, dict):
+        row = [data[subject] for subject in curriculum.semesters[semester]]
+        row += [TYPICAL_COMMON[field] if pd.isna(data.get(field)) else data[field] for field in COMMON_FIELDS]
+        return np.array([row], dtype=float)
+    if not isinstance(data, pd.DataFrame):
+        data = pd.DataFrame(data)
+    common = data.reindex(columns=list(COMMON_FIELDS)).apply(pd.to_numeric, errors="coerce")
+    common = common.fillna(TYPICAL_COMMON).to_numpy(dtype=float)
+    return np.hstack([marks_matrix(data, semester, curriculum).astype(float), common])
+
+
+# Synthetic cohort for one semester. Each student has a latent ability that
+# drives their internal marks and the common inputs; the label is whether the
+# final result (ability plus effort plus noise) clears PASS_THRESHOLD percent.
+# Marks are rescaled to the curriculum's max_marks.
+def generate_training_data(semester, n_samples=N_SAMPLES, seed=SEED, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    rng = np.random.default_rng(seed + semester)
+    n_subjects = len(curriculum.semesters[semester])
+    scale = curriculum.max_marks / GENERATOR_MAX_MARKS
+
+    ability = rng.normal(size=(n_samples, 1))
+    marks = np.clip(np.rint(scale * (38 + 10 * ability + 8 * rng.normal(size=(n_samples, n_subjects)))), 0, curriculum.max_marks)
+    attendance = np.clip(np.rint(75 + 10 * ability[:, 0] + 10 * rng.normal(size=n_samples)), 0, 100)
+    assignments = np.clip(np.rint(6 + 1.5 * ability[:, 0] + 2 * rng.normal(size=n_samples)), 0, 10)
+    participation = np.clip(np.rint(5 + 1.5 * ability[:, 0] + 2.5 * rng.normal(size=n_samples)), 0, 10)
+
+    percentage = marks.mean(axis=1) / curriculum.max_marks * 100
+    final_score = (
+        0.8 * percentage
+        + 0.1 * (attendance - 75)
+        + 0.8 * (assignments - 5)
+        + 0.4 * (participation - 5)
+        + 6 * rng.normal(size=n_samples)
+    )
+    features = np.column_stack([marks, attendance, assignments, participation])
+    labels = (final_score >= PASS_THRESHOLD).astype(int)
+    return features, labels
+
+
+# Logistic model for one semester of a curriculum that supports incremental updates
+class SemesterModel:
+    def __init__(self, semester, seed=SEED, curriculum=None):
+        curriculum = get_curriculum(curriculum)
+        self.semester = semester
+        self.curriculum = curriculum.id
+        self.curriculum_version = curriculum.version
+        self.features = feature_columns(semester, curriculum)
+        self.scaler = StandardScaler()
+        self.classifier = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=seed)
+
+    def fit(self, features, labels, epochs=5):
+        self.scaler.fit(features)
+        scaled = self.scaler.transform(features)
+        for _ in range(epochs):
+            self.classifier.partial_fit(scaled, labels, classes=[0, 1])
+        return self
+
+    # Fold newly labelled students into the model without retraining from scratch.
+    # The scaler stays frozen: the learned coefficients are tied to its scaling.
+    def partial_fit(self, features, labels):
+        self.classifier.partial_fit(self.scaler.transform(features), labels, classes=[0, 1])
+        return self
+
+    # Pass probability for every student in one call
+    def predict_proba(self, features):
+        return self.classifier.predict_proba(self.scaler.transform(features))[:, 1]
+
+
+def model_path(semester, model_dir=MODEL_DIR, curriculum=None):
+    return Path(model_dir) / get_curriculum(curriculum).id / f"semester_{semester}.joblib"
+
+
+def save_model(model, model_dir=MODEL_DIR):
+    path = model_path(model.semester, model_dir, model.curriculum)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, path)
+    return path
+
+
+def train_model(semester, n_samples=N_SAMPLES, seed=SEED, curriculum=None):
+    features, labels = generate_training_data(semester, n_samples, seed, curriculum)
+    return SemesterModel(semester, seed, curriculum).fit(features, labels)
+
+
+# Load each semester's model of a curriculum from disk, training and saving any
+# that are missing or were fitted for a different subject list or version
+def load_models(model_dir=MODEL_DIR, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    models = {}
+    for semester in curriculum.semesters:
+        path = model_path(semester, model_dir, curriculum)
+        model = None
+        if path.exists():
+            try:
+                model = joblib.load(path)
+            except Exception:
+                model = None
+        if (model is None or model.features != feature_columns(semester, curriculum)
+                or getattr(model, "curriculum_version", None) != curriculum.version):
+            model = train_model(semester, curriculum=curriculum)
+            save_model(model, model_dir)
+        models[semester] = model
+    return models
+
+
+# Batch pass probabilities for a cohort in one semester, using the subjects of
+# the curriculum the model was trained for
+def predict_proba(models, semester, data):
+    model = models[semester]
+    return model.predict_proba(feature_matrix(data, semester, model.curriculum))
+
+
+# Incrementally retrain a semester on newly labelled students and persist it
+def update_model(models, semester, data, labels, model_dir=MODEL_DIR):
+    model = models[semester]
+    model.partial_fit(feature_matrix(data, semester, model.curriculum), np.asarray(labels, dtype=int))
+    save_model(model, model_dir)
+    return model
@@ -0,0 +1,189 @@
+import csv
+import io
+import re
+import zipfile
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from curriculum import get_curriculum
+from metrics import span
+
+# Everything recommended for one failed subject, resolved once per curriculum
+SubjectBundle = namedtuple("SubjectBundle", ["subject", "book", "topics", "syllabus_file", "paper_file"])
+
+
+def _bundle(subject):
+    return SubjectBundle(
+        subject=subject.name,
+        book=subject.book,
+        topics=subject.topics,
+        syllabus_file=subject.syllabus_file,
+        paper_file=f"{subject.name.replace(' ', '_')}.pdf",
+    )
+
+
+# Plain-text study plan section for one subject
+def _plan_section(bundle):
+    lines = [f"## {bundle.subject}"]
+    if bundle.book:
+        lines.append(f"Recommended book: {bundle.book}")
+    if bundle.topics:
+        lines.append("Important topics:")
+        lines.extend(f"- {topic}" for topic in bundle.topics)
+    if bundle.syllabus_file:
+        lines.append(f"Syllabus: {bundle.syllabus_file}")
+    return "\n".join(lines) + "\n"
+
+
+# Bundles and plan sections of every subject in a curriculum, built on first use
+# and shared by every caller in the process
+@lru_cache(maxsize=None)
+def _compiled(curriculum):
+    bundles = MappingProxyType({name: _bundle(subject) for name, subject in curriculum.subjects.items()})
+    sections = MappingProxyType({name: _plan_section(bundle) for name, bundle in bundles.items()})
+    return bundles, sections
+
+
+def curriculum_bundles(curriculum=None):
+    return _compiled(get_curriculum(curriculum))[0]
+
+
+def plan_sections(curriculum=None):
+    return _compiled(get_curriculum(curriculum))[1]
+
+
+# The default curriculum's bundles and plan sections
+SUBJECT_BUNDLES = curriculum_bundles()
+PLAN_SECTIONS = plan_sections()
+
+
+# Bundles for a list of failed subjects, in the order given
+def subject_bundles(subjects, curriculum=None):
+    bundles = curriculum_bundles(curriculum)
+    return [bundles[subject] for subject in subjects if subject in bundles]
+
+
+# Everything the recommendations panel shows for a list of failed subjects:
+# books, topics paired with the syllabus unit that covers them, and the bytes
+# of the past papers and syllabi. `assets` is an AssetLibrary and `index` a
+# SyllabusIndex.
+def gather_recommendations(subjects, assets, index, curriculum=None):
+    recommendations = {
+        "Books": [],
+        "Important Topics": [],
+        "Previous Papers": [],
+        "Syllabus": []
+    }
+    for bundle in subject_bundles(subjects, curriculum):
+        if bundle.book:
+            recommendations["Books"].append((bundle.subject, bundle.book))
+        if bundle.topics:
+            recommendations["Important Topics"].append(
+                (bundle.subject, [(topic, index.best_unit(bundle.subject, topic)) for topic in bundle.topics])
+            )
+
+        with span("pdf_read"):
+            paper_data = assets.paper(bundle.paper_file)
+        if paper_data is not None:
+            recommendations["Previous Papers"].append((bundle.subject, paper_data))
+
+        if bundle.syllabus_file:
+            with span("pdf_read"):
+                syllabus_data = assets.syllabus(bundle.syllabus_file)
+            if syllabus_data is not None:
+                recommendations["Syllabus"].append((bundle.subject, syllabus_data))
+    return recommendations
+
+
+# Study plans for a whole cohort in one pass over the failed-subject mask
+# (students x subjects, as in SemesterGrades.failed). Returns
+# {student id: [SubjectBundle, ...]} for every student with a failed subject.
+# A student listed more than once is planned from their last row, the one the
+# store keeps.
+def study_plans(failed, semester, student_ids=None, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    bundles = curriculum_bundles(curriculum)
+    failed = np.asarray(failed, dtype=bool)
+    subjects = curriculum.semesters[semester]
+    if student_ids is None:
+        student_ids = range(failed.shape[0])
+    student_ids = np.asarray(list(student_ids), dtype=object)
+
+    last_rows = {student_id: row for row, student_id in enumerate(student_ids.tolist())}
+    rows, cols = np.nonzero(failed)
+    plans = {}
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if last_rows[student_ids[row]] == row:
+            plans.setdefault(student_ids[row], []).append(bundles[subjects[col]])
+    return plans
+
+
+def render_plan(student_id, semester, bundles, curriculum=None):
+    sections = plan_sections(curriculum)
+    header = f"# Study plan for {student_id} - Semester {semester}\n\n"
+    return header + "\n".join(sections[bundle.subject] for bundle in bundles)
+
+
+_UNSAFE_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+# Archive entry name for a student id: the id may come from an uploaded sheet,
+# so anything but letters, digits, "_", "-" and "." is replaced and leading
+# dots are dropped, keeping the entry inside the extraction directory. Names
+# already in `taken` (compared case-insensitively) get a numeric suffix.
+def archive_entry_name(student_id, taken, suffix=""):
+    stem = _UNSAFE_NAME_CHARACTERS.sub("_", str(student_id)).lstrip(".")[:100] or "student"
+    name, number = f"{stem}{suffix}", 1
+    while name.lower() in taken:
+        number += 1
+        name = f"{stem}-{number}{suffix}"
+    taken.add(name.lower())
+    return name
+
+
+# Compressed archive of study plans, one text file per student plus an index.
+# Plans can be added in batches, e.g. per imported chunk; a student added again
+# for the same semester replaces their earlier plan, as the store keeps their
+# last row. The plans are rendered and written when the archive is closed.
+class StudyPlanArchive:
+    def __init__(self, file, curriculum=None):
+        self.curriculum = get_curriculum(curriculum)
+        self.zip = zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED)
+        self.plans = {}
+
+    def add(self, failed, semester, student_ids=None):
+        failed = np.asarray(failed, dtype=bool)
+        student_ids = list(range(failed.shape[0]) if student_ids is None else student_ids)
+        for student_id in student_ids:
+            self.plans.pop((semester, student_id), None)
+        plans = study_plans(failed, semester, student_ids, self.curriculum)
+        for student_id, bundles in plans.items():
+            self.plans[(semester, student_id)] = bundles
+        return len(plans)
+
+    def close(self):
+        index = io.StringIO()
+        writer = csv.writer(index)
+        writer.writerow(["Student ID", "Semester", "Failed Subjects", "Subjects", "File"])
+        taken = {}
+        for (semester, student_id), bundles in self.plans.items():
+            name = f"semester_{semester}/{archive_entry_name(student_id, taken.setdefault(semester, set()), '.md')}"
+            self.zip.writestr(name, render_plan(student_id, semester, bundles, self.curriculum))
+            writer.writerow([student_id, semester, len(bundles), "; ".join(b.subject for b in bundles), name])
+        self.zip.writestr("index.csv", index.getvalue())
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Write every failing student's study plan into one zip archive
+def export_study_plans(file, failed, semester, student_ids=None, curriculum=None):
+    with StudyPlanArchive(file, curriculum) as archive:
+        return archive.add(failed, semester, student_ids)
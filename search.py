@@ -0,0 +1,220 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from assets import ASSET_ROOTS
+from curriculum import load_curricula
+
+# On-disk syllabus search index
+INDEX_PATH = Path(os.environ.get("SYLLABUS_INDEX", "syllabus_index.json"))
+INDEX_VERSION = 1
+
+# BM25 ranking parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+UNIT_PATTERN = re.compile(r"^\s*UNIT\s*[-–:]?\s*([IVX]+|\d+)\b", re.IGNORECASE | re.MULTILINE)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the their to with "
+    "hrs hours hour unit students will able".split()
+)
+
+# Syllabus file -> subject across every curriculum; programmes sharing a
+# syllabus PDF share its index entries
+SUBJECT_BY_FILE = {
+    subject.syllabus_file.lower(): subject.name
+    for curriculum in load_curricula().values()
+    for subject in curriculum.subjects.values()
+    if subject.syllabus_file
+}
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Split a syllabus PDF into (unit, page, heading, text) segments. Text before
+# the first UNIT heading is kept as the "Overview" segment.
+def extract_segments(path):
+    from pypdf import PdfReader
+
+    segments = []
+    unit, heading = "Overview", ""
+    for page_number, page in enumerate(PdfReader(path).pages, start=1):
+        text = page.extract_text() or ""
+        position = 0
+        for match in UNIT_PATTERN.finditer(text):
+            segments.append((unit, page_number, heading, text[position:match.start()]))
+            unit = f"UNIT-{match.group(1).upper()}"
+            following = [line.strip() for line in text[match.end():].splitlines()]
+            heading = next((line for line in following[1:] if line and not re.fullmatch(r"[\d\s]*hrs?|[\d\s]*hours?", line, re.IGNORECASE)), "")
+            position = match.start()
+        segments.append((unit, page_number, heading, text[position:]))
+    return [segment for segment in segments if segment[3].strip()]
+
+
+# Index record for one syllabus file: identity for change detection plus the
+# term counts of each segment
+def index_file(path):
+    stat = path.stat()
+    return {
+        "subject": SUBJECT_BY_FILE.get(path.name.lower(), path.stem.replace("_Syllabus", "").replace("_", " ")),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": file_hash(path),
+        "segments": [
+            {"unit": unit, "page": page, "heading": heading, "terms": Counter(tokenize(text))}
+            for unit, page, heading, text in extract_segments(path)
+        ],
+    }
+
+
+# Inverted index over the syllabus PDFs: tokens -> (subject, unit, page)
+# segments, ranked with BM25. Only files whose mtime and content hash changed
+# are re-parsed on refresh.
+class SyllabusIndex:
+    def __init__(self, path=INDEX_PATH, roots=None):
+        self.path = Path(path)
+        self.roots = roots or ASSET_ROOTS["syllabus"]
+        self.lock = threading.Lock()
+        self.files = {}
+        self.segments = []
+        self.postings = {}
+        self.average_length = 0.0
+
+    def source_files(self):
+        files = {}
+        for root in reversed(self.roots):
+            if Path(root).is_dir():
+                files.update({path.name: path for path in Path(root).glob("*.pdf")})
+        return files
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+        with self.lock:
+            self.files = data["files"]
+            self.segments = data["segments"]
+            self.postings = data["postings"]
+            self.average_length = data["average_length"]
+        return True
+
+    def save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "files": self.files,
+            "segments": self.segments,
+            "postings": self.postings,
+            "average_length": self.average_length,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary, self.path)
+
+    # Re-parse new or changed files, drop deleted ones and rebuild the postings.
+    # Returns the names of the files that were re-parsed.
+    def refresh(self):
+        sources = self.source_files()
+        files = {name: record for name, record in self.files.items() if name in sources}
+        changed = []
+        touched = False
+        for name, path in sources.items():
+            record = files.get(name)
+            stat = path.stat()
+            if record and (record["mtime"], record["size"]) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            if record and record["size"] == stat.st_size and record["hash"] == file_hash(path):
+                record["mtime"] = stat.st_mtime_ns
+                touched = True
+                continue
+            files[name] = index_file(path)
+            changed.append(name)
+
+        if changed or files.keys() != self.files.keys() or not self.postings:
+            self._build(files)
+            self.save()
+        elif touched:
+            self.files = files
+            self.save()
+        return changed
+
+    def _build(self, files):
+        segments = []
+        postings = defaultdict(list)
+        for name in sorted(files):
+            record = files[name]
+            for segment in record["segments"]:
+                segment_id = len(segments)
+                length = sum(segment["terms"].values())
+                segments.append([record["subject"], segment["unit"], segment["page"], segment["heading"], name, length])
+                for token, count in segment["terms"].items():
+                    postings[token].append([segment_id, count])
+        with self.lock:
+            self.files = files
+            self.segments = segments
+            self.postings = dict(postings)
+            self.average_length = (sum(segment[5] for segment in segments) / len(segments)) if segments else 0.0
+
+    # Load the saved index and bring it up to date with the syllabus folder
+    def open(self):
+        self.load()
+        self.refresh()
+        return self
+
+    # Ranked (subject, unit, page) hits for a free-text query, optionally
+    # restricted to some subjects
+    def search(self, query, limit=10, subjects=None):
+        tokens = set(tokenize(query))
+        with self.lock:
+            segments, postings, average_length = self.segments, self.postings, self.average_length
+        if not tokens or not segments:
+            return []
+
+        scores = defaultdict(float)
+        total = len(segments)
+        for token in tokens:
+            matches = postings.get(token, ())
+            if not matches:
+                continue
+            idf = math.log(1 + (total - len(matches) + 0.5) / (len(matches) + 0.5))
+            for segment_id, count in matches:
+                length = segments[segment_id][5]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                scores[segment_id] += idf * count * (BM25_K1 + 1) / (count + norm)
+
+        hits = []
+        for segment_id, score in sorted(scores.items(), key=lambda item: -item[1]):
+            subject, unit, page, heading, filename, _ = segments[segment_id]
+            if subjects is not None and subject not in subjects:
+                continue
+            hits.append({"Subject": subject, "Unit": unit, "Page": page, "Heading": heading,
+                         "File": filename, "Score": round(score, 3)})
+            if len(hits) >= limit:
+                break
+        return hits
+
+    # Best matching syllabus unit of a subject for a topic, or None
+    def best_unit(self, subject, topic):
+        hits = self.search(topic, limit=1, subjects={subject})
+        return hits[0] if hits else None
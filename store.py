@@ -0,0 +1,416 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from subjects import COMMON_FIELDS
+from curriculum import DEFAULT_CURRICULUM, get_curriculum
+from analytics import rollup_deltas
+from importer import clean_student_ids
+
+# SQLite database holding submitted performance records of the default curriculum
+DATABASE_PATH = Path(os.environ.get("PERFORMANCE_DB", "performance.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    student_id TEXT NOT NULL REFERENCES students(student_id),
+    semester INTEGER NOT NULL,
+    attendance REAL,
+    assignments REAL,
+    participation REAL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, semester)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS subject_marks (
+    student_id TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    marks REAL NOT NULL,
+    PRIMARY KEY (student_id, semester, subject)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_subject_marks_semester_subject ON subject_marks (semester, subject);
+"""
+
+# Pre-aggregated cohort statistics, kept up to date on every write so the
+# dashboard never rescans the raw marks
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS semester_stats (
+    semester INTEGER PRIMARY KEY,
+    students INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    pct_sum REAL NOT NULL,
+    pct_sum_sq REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subject_stats (
+    semester INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    students INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    marks_sum REAL NOT NULL,
+    marks_sum_sq REAL NOT NULL,
+    PRIMARY KEY (semester, subject)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS marks_histogram (
+    semester INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (semester, subject, bin)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS percentage_histogram (
+    semester INTEGER NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (semester, bin)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS factor_stats (
+    semester INTEGER NOT NULL,
+    factor TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    x_sum REAL NOT NULL,
+    x_sum_sq REAL NOT NULL,
+    passed_sum REAL NOT NULL,
+    x_passed_sum REAL NOT NULL,
+    pct_sum REAL NOT NULL,
+    pct_sum_sq REAL NOT NULL,
+    x_pct_sum REAL NOT NULL,
+    PRIMARY KEY (semester, factor)
+) WITHOUT ROWID;
+"""
+# Bumped when tables are added; older databases get their rollups rebuilt once
+SCHEMA_VERSION = 1
+
+# Upserts adding a rollup delta to the stored aggregates, keyed like rollup_deltas()
+ROLLUP_UPSERTS = {
+    "semester": """
+        INSERT INTO semester_stats VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (semester) DO UPDATE SET
+            students = students + excluded.students, passed = passed + excluded.passed,
+            pct_sum = pct_sum + excluded.pct_sum, pct_sum_sq = pct_sum_sq + excluded.pct_sum_sq
+    """,
+    "subjects": """
+        INSERT INTO subject_stats VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (semester, subject) DO UPDATE SET
+            students = students + excluded.students, failed = failed + excluded.failed,
+            marks_sum = marks_sum + excluded.marks_sum, marks_sum_sq = marks_sum_sq + excluded.marks_sum_sq
+    """,
+    "histogram": """
+        INSERT INTO marks_histogram VALUES (?, ?, ?, ?)
+        ON CONFLICT (semester, subject, bin) DO UPDATE SET count = count + excluded.count
+    """,
+    "percentages": """
+        INSERT INTO percentage_histogram VALUES (?, ?, ?)
+        ON CONFLICT (semester, bin) DO UPDATE SET count = count + excluded.count
+    """,
+    "factors": """
+        INSERT INTO factor_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (semester, factor) DO UPDATE SET
+            n = n + excluded.n, x_sum = x_sum + excluded.x_sum, x_sum_sq = x_sum_sq + excluded.x_sum_sq,
+            passed_sum = passed_sum + excluded.passed_sum, x_passed_sum = x_passed_sum + excluded.x_passed_sum,
+            pct_sum = pct_sum + excluded.pct_sum, pct_sum_sq = pct_sum_sq + excluded.pct_sum_sq,
+            x_pct_sum = x_pct_sum + excluded.x_pct_sum
+    """,
+}
+ROLLUP_TABLES = {
+    "semester": "semester_stats",
+    "subjects": "subject_stats",
+    "histogram": "marks_histogram",
+    "percentages": "percentage_histogram",
+    "factors": "factor_stats",
+}
+
+UPSERT_STUDENT = "INSERT OR IGNORE INTO students (student_id) VALUES (?)"
+UPSERT_SEMESTER = """
+INSERT INTO semesters (student_id, semester, attendance, assignments, participation)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (student_id, semester) DO UPDATE SET
+    attendance = excluded.attendance,
+    assignments = excluded.assignments,
+    participation = excluded.participation,
+    updated_at = CURRENT_TIMESTAMP
+"""
+UPSERT_MARKS = """
+INSERT INTO subject_marks (student_id, semester, subject, marks) VALUES (?, ?, ?, ?)
+ON CONFLICT (student_id, semester, subject) DO UPDATE SET marks = excluded.marks
+"""
+
+# Rows written per transaction during bulk imports
+BATCH_SIZE = 5000
+
+
+# Each curriculum keeps its records and rollups in its own database next to
+# DATABASE_PATH, so programmes with different subjects never mix
+def database_path(curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    if curriculum.id == DEFAULT_CURRICULUM:
+        return DATABASE_PATH
+    return DATABASE_PATH.with_name(f"{DATABASE_PATH.stem}-{curriculum.id}{DATABASE_PATH.suffix}")
+
+
+# Storage interface the app and importer depend on
+class PerformanceRepository(ABC):
+    # Store one student's inputs for a semester
+    @abstractmethod
+    def save_semester(self, student_id, semester, student_data):
+        ...
+
+    # Store a cohort DataFrame with a student id column, subject columns and
+    # optional common inputs, returning the number of students written
+    @abstractmethod
+    def save_cohort(self, semester, df, id_column="Student ID"):
+        ...
+
+    # {semester: {subject or common field: value}} for one student, the same
+    # shape the semester tabs produce
+    @abstractmethod
+    def get_performance(self, student_id):
+        ...
+
+    # {name: DataFrame} of the pre-aggregated cohort statistics
+    @abstractmethod
+    def rollups(self):
+        ...
+
+    # Every stored student as lists of (student_id, performance_data), one
+    # page of `batch_size` students at a time
+    @abstractmethod
+    def iter_performance(self, batch_size=BATCH_SIZE):
+        ...
+
+
+class SQLitePerformanceStore(PerformanceRepository):
+    def __init__(self, path=DATABASE_PATH, curriculum=None):
+        self.path = str(path)
+        self.curriculum = get_curriculum(curriculum)
+        # One write connection shared by every session in the process; the lock
+        # serialises writes since sqlite3 connections are not thread-safe.
+        # Reads use a small pool of their own connections (see _reader).
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.RLock()
+        self.readers = queue.SimpleQueue()
+        with self.lock:
+            if self.path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(SCHEMA + ROLLUP_SCHEMA)
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self.rebuild_rollups()
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # A read connection for the duration of one read. Under WAL, readers see the
+    # last committed state and never wait for a write transaction, so history
+    # lookups stay fast during bulk imports. Connections are pooled rather than
+    # per thread, as Streamlit runs each rerun on a new thread. An in-memory
+    # database only exists on the write connection, so it is read there.
+    @contextmanager
+    def _reader(self):
+        if self.path == ":memory:":
+            with self.lock:
+                yield self.connection
+            return
+        try:
+            connection = self.readers.get_nowait()
+        except queue.Empty:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA query_only = ON")
+        try:
+            # One snapshot for every statement of the read
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            finally:
+                connection.execute("COMMIT")
+        finally:
+            self.readers.put(connection)
+
+    def _apply_rollups(self, deltas):
+        for name, rows in deltas.items():
+            if rows:
+                self.connection.executemany(ROLLUP_UPSERTS[name], rows)
+
+    # Stored records of a semester for the given students, in the shape
+    # save_cohort writes (student_id, subjects..., common fields...)
+    def _existing(self, semester, ids):
+        subjects = list(self.curriculum.semesters[semester])
+        common = self.connection.execute(
+            "SELECT student_id, attendance, assignments, participation FROM semesters "
+            "WHERE semester = ? AND student_id IN (SELECT value FROM json_each(?))",
+            (semester, json.dumps(ids)),
+        ).fetchall()
+        if not common:
+            return pd.DataFrame(columns=["student_id"] + subjects + list(COMMON_FIELDS))
+        marks = self.connection.execute(
+            "SELECT student_id, subject, marks FROM subject_marks "
+            "WHERE semester = ? AND student_id IN (SELECT value FROM json_each(?))",
+            (semester, json.dumps(ids)),
+        ).fetchall()
+        frame = pd.DataFrame(common, columns=["student_id"] + list(COMMON_FIELDS)).set_index("student_id")
+        pivot = pd.DataFrame(marks, columns=["student_id", "subject", "marks"]).pivot(
+            index="student_id", columns="subject", values="marks"
+        ).reindex(columns=subjects)
+        return frame.join(pivot).dropna(subset=subjects).reset_index()
+
+    # Write one batch of semester records (columns: student_id, subjects...,
+    # common fields...) and move the rollups from the old values to the new
+    def _save_batch(self, semester, batch):
+        subjects = list(self.curriculum.semesters[semester])
+        ids = batch["student_id"].tolist()
+        rows = batch.astype(object).where(batch.notna(), None)
+        common = rows[list(COMMON_FIELDS)].itertuples(index=False, name=None)
+        marks = rows.melt(id_vars=["student_id"], value_vars=subjects, var_name="subject", value_name="marks")
+
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                old = self._existing(semester, ids)
+                self.connection.executemany(UPSERT_STUDENT, [(student_id,) for student_id in ids])
+                self.connection.executemany(UPSERT_SEMESTER, [(student_id, semester, *values) for student_id, values in zip(ids, common)])
+                self.connection.executemany(UPSERT_MARKS, [
+                    (student_id, semester, subject, value)
+                    for student_id, subject, value in marks.itertuples(index=False, name=None)
+                ])
+                self._apply_rollups(rollup_deltas(semester, old, sign=-1, curriculum=self.curriculum))
+                self._apply_rollups(rollup_deltas(semester, batch, curriculum=self.curriculum))
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def save_semester(self, student_id, semester, student_data):
+        columns = list(self.curriculum.semesters[semester]) + list(COMMON_FIELDS)
+        batch = pd.DataFrame([[student_id] + [student_data.get(column) for column in columns]], columns=["student_id"] + columns)
+        self._save_batch(semester, batch)
+
+    def save_cohort(self, semester, df, id_column="Student ID"):
+        subjects = list(self.curriculum.semesters[semester])
+        df = df.reindex(columns=[id_column] + subjects + list(COMMON_FIELDS)).rename(columns={id_column: "student_id"})
+        # Rows without an id cannot be stored; ids are compared as text
+        df["student_id"] = clean_student_ids(df["student_id"])
+        df = df.dropna(subset=["student_id"])
+        # A student listed twice keeps their last row, as the upsert would
+        df = df.drop_duplicates("student_id", keep="last")
+        for column in subjects + list(COMMON_FIELDS):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        df = df.dropna(subset=subjects)
+
+        for start in range(0, len(df), BATCH_SIZE):
+            self._save_batch(semester, df.iloc[start:start + BATCH_SIZE])
+        return len(df)
+
+    # Recompute every rollup from the raw marks; only needed after a migration
+    def rebuild_rollups(self):
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                for table in ROLLUP_TABLES.values():
+                    self.connection.execute(f"DELETE FROM {table}")
+                for semester in self.curriculum.semesters:
+                    ids = [row[0] for row in self.connection.execute(
+                        "SELECT student_id FROM semesters WHERE semester = ?", (semester,)
+                    )]
+                    for start in range(0, len(ids), BATCH_SIZE):
+                        existing = self._existing(semester, ids[start:start + BATCH_SIZE])
+                        self._apply_rollups(rollup_deltas(semester, existing, curriculum=self.curriculum))
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def rollups(self):
+        with self._reader() as connection:
+            return {
+                name: pd.read_sql_query(f"SELECT * FROM {table}", connection)
+                for name, table in ROLLUP_TABLES.items()
+            }
+
+    # {student_id: performance_data} from semesters and subject_marks rows
+    @staticmethod
+    def _performances(semesters, marks):
+        performances = {}
+        for student_id, semester, *common in semesters:
+            performances.setdefault(student_id, {})[semester] = dict(zip(COMMON_FIELDS, common))
+        for student_id, semester, subject, value in marks:
+            performance_data = performances.get(student_id, {})
+            if semester in performance_data:
+                performance_data[semester][subject] = int(value) if float(value).is_integer() else value
+        return performances
+
+    def get_performance(self, student_id):
+        with self._reader() as connection:
+            semesters = connection.execute(
+                "SELECT student_id, semester, attendance, assignments, participation FROM semesters WHERE student_id = ?",
+                (student_id,),
+            ).fetchall()
+            marks = connection.execute(
+                "SELECT student_id, semester, subject, marks FROM subject_marks WHERE student_id = ?",
+                (student_id,),
+            ).fetchall()
+        return self._performances(semesters, marks).get(student_id, {})
+
+    def student_count(self):
+        with self._reader() as connection:
+            return connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    # (first, last) student ids of consecutive pages of `batch_size` students
+    def id_ranges(self, batch_size=BATCH_SIZE):
+        last = ""
+        while True:
+            with self._reader() as connection:
+                ids = [row[0] for row in connection.execute(
+                    "SELECT student_id FROM students WHERE student_id > ? ORDER BY student_id LIMIT ?",
+                    (last, batch_size),
+                )]
+            if not ids:
+                return
+            yield ids[0], ids[-1]
+            last = ids[-1]
+
+    # [(student_id, performance_data)] in id order for the students from
+    # `first` to `last`, read with primary-key range scans
+    def performance_range(self, first, last):
+        with self._reader() as connection:
+            semesters = connection.execute(
+                "SELECT student_id, semester, attendance, assignments, participation FROM semesters "
+                "WHERE student_id BETWEEN ? AND ?",
+                (first, last),
+            ).fetchall()
+            marks = connection.execute(
+                "SELECT student_id, semester, subject, marks FROM subject_marks WHERE student_id BETWEEN ? AND ?",
+                (first, last),
+            ).fetchall()
+        return sorted(self._performances(semesters, marks).items())
+
+    # Pages through the students in id order, so memory stays bounded by the
+    # page size however large the cohort is
+    def iter_performance(self, batch_size=BATCH_SIZE):
+        for first, last in self.id_ranges(batch_size):
+            yield self.performance_range(first, last)
+
+    # Marks for every student in a semester, one row per student
+    def semester_frame(self, semester):
+        with self._reader() as connection:
+            rows = connection.execute(
+                "SELECT student_id, subject, marks FROM subject_marks WHERE semester = ?",
+                (semester,),
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=["Student ID", "subject", "marks"])
+        return frame.pivot(index="Student ID", columns="subject", values="marks").reindex(columns=list(self.curriculum.semesters[semester]))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,16 @@
+# Semester-wise subjects and marks rules of the default curriculum. The
+# curricula themselves live in curricula/*.json; code that serves more than one
+# programme takes a `curriculum` argument instead of using these.
+from curriculum import get_curriculum
+
+_DEFAULT = get_curriculum()
+SEMESTER_SUBJECTS = _DEFAULT.semesters
+MAX_MARKS = _DEFAULT.max_marks
+SUBJECT_PASS_MARK = _DEFAULT.pass_mark
+
+# Common inputs collected for every semester, with their maximum values
+COMMON_FIELDS = {
+    "Attendance": 100,
+    "Assignments": 10,
+    "Participation": 10,
+}
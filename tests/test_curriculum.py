@@ -0,0 +1,81 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from curriculum import FORMAT_VERSION, compile_curriculum, load_curricula
+
+PATH = Path("test.json")
+VALID = {
+    "format": FORMAT_VERSION,
+    "id": "test-programme",
+    "name": "Test Programme",
+    "version": 1,
+    "max_marks": 60,
+    "pass_mark": 30,
+    "semesters": {
+        "1": [
+            {"name": "Algebra", "credits": 4, "book": "Algebra by Artin", "topics": ["Groups"], "syllabus": "Algebra.pdf"},
+            {"name": "English", "credits": None},
+        ],
+        "2": [{"name": "Statistics", "credits": 3, "topics": []}],
+    },
+}
+
+
+def document(**changes):
+    result = copy.deepcopy(VALID)
+    result.update(changes)
+    return result
+
+
+def test_valid_curriculum_compiles():
+    curriculum = compile_curriculum(document(), PATH)
+    assert curriculum.semesters == {1: ("Algebra", "English"), 2: ("Statistics",)}
+    assert curriculum.subjects["Algebra"].topics == ("Groups",)
+    assert curriculum.subjects["English"].credits is None
+
+
+@pytest.mark.parametrize("changes, message", [
+    ({"format": 2}, f"unsupported format 2, expected {FORMAT_VERSION}"),
+    ({"id": " "}, "'id' must be a non-empty string"),
+    ({"version": "1"}, "'version' must be an integer"),
+    ({"max_marks": 0}, "'max_marks' must be a positive integer"),
+    ({"pass_mark": 61}, "'pass_mark' must be an integer between 0 and 60"),
+    ({"semesters": {}}, "'semesters' must map semester numbers to subject lists"),
+    ({"semesters": {"0": [{"name": "Algebra"}]}}, "semester '0' is not a positive number"),
+    ({"semesters": {"1": []}}, "semester 1 has no subjects"),
+    ({"semesters": {"1": [{"credits": 4}]}}, "semester 1 has a subject without a name"),
+    ({"semesters": {"1": [{"name": "Algebra"}], "2": [{"name": "Algebra"}]}}, "subject 'Algebra' is listed more than once"),
+    ({"semesters": {"1": [{"name": "Algebra", "credits": -1}]}}, "Algebra: 'credits' must be a non-negative integer or null"),
+    ({"semesters": {"1": [{"name": "Algebra", "topics": "Groups"}]}}, "Algebra: 'topics' must be a list of strings"),
+    ({"semesters": {"1": [{"name": "Algebra", "book": ""}]}}, "Algebra: 'book' and 'syllabus' must be strings or null"),
+])
+def test_invalid_curriculum_is_rejected(changes, message):
+    with pytest.raises(ValueError) as excinfo:
+        compile_curriculum(document(**changes), PATH)
+    assert str(excinfo.value) == f"Invalid curriculum test.json: {message}"
+
+
+def test_non_object_document_is_rejected():
+    with pytest.raises(ValueError, match=r"^Invalid curriculum test\.json: expected a JSON object$"):
+        compile_curriculum([], PATH)
+
+
+def test_malformed_json_file_is_rejected(tmp_path):
+    (tmp_path / "broken.json").write_text('{"format": 1,', encoding="utf-8")
+    with pytest.raises(ValueError, match=r"^Invalid curriculum broken\.json: "):
+        load_curricula(tmp_path)
+
+
+def test_duplicate_curriculum_id_is_rejected(tmp_path):
+    for name in ("a.json", "b.json"):
+        (tmp_path / name).write_text(json.dumps(VALID), encoding="utf-8")
+    with pytest.raises(ValueError, match=r"^Invalid curriculum b\.json: duplicate curriculum id 'test-programme'$"):
+        load_curricula(tmp_path)
+
+
+def test_empty_curriculum_directory_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match=r"^No curriculum files found in "):
+        load_curricula(tmp_path)
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from curriculum import get_curriculum
+from evaluation import evaluate_batch, evaluate_student
+from predictor import TYPICAL_COMMON, load_models
+
+CURRICULUM = get_curriculum()
+SUBJECTS = CURRICULUM.semesters[1]
+
+
+# Trained once into a temporary directory, so the repository's models are left alone
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    return load_models(tmp_path_factory.mktemp("models"), CURRICULUM)
+
+
+def test_missing_common_inputs_take_typical_values(models):
+    marks = dict.fromkeys(SUBJECTS, 40)
+    result = evaluate_student(marks, 1, models, CURRICULUM)
+    assert result["pass_status"] == 1
+    assert result["pass_probability"] > 0.5
+    assert result["pass_probability"] == evaluate_student({**marks, **TYPICAL_COMMON}, 1, models, CURRICULUM)["pass_probability"]
+
+
+# The API sends batch results as they are, so they must be strict JSON
+def as_json(result):
+    return json.loads(json.dumps(result, allow_nan=False))
+
+
+def test_batch_with_some_student_ids_missing(models):
+    records = [
+        {**dict.fromkeys(SUBJECTS, 40), "Student ID": "S1"},
+        dict.fromkeys(SUBJECTS, 40),
+        {**dict.fromkeys(SUBJECTS, 20), "Student ID": "S3"},
+    ]
+    result = as_json(evaluate_batch(records, 1, models, CURRICULUM))
+    assert [row["student_id"] for row in result["results"]] == ["S1", None, "S3"]
+    assert [row["passed"] for row in result["results"]] == [True, True, False]
+    assert result["errors"] == []
+
+
+def test_empty_batch(models):
+    assert as_json(evaluate_batch([], 1, models, CURRICULUM)) == {"semester": 1, "results": [], "errors": []}
+
+
+def test_batch_reports_non_numeric_and_out_of_range_cells(models):
+    records = [
+        {**dict.fromkeys(SUBJECTS, 40), SUBJECTS[0]: "forty"},
+        {**dict.fromkeys(SUBJECTS, 40), SUBJECTS[1]: 61, "Attendance": None},
+        dict.fromkeys(SUBJECTS, 45),
+    ]
+    result = as_json(evaluate_batch(records, 1, models, CURRICULUM))
+    assert [row["row"] for row in result["results"]] == [2]
+    assert result["errors"] == [
+        {"row": 0, "column": SUBJECTS[0], "value": "forty"},
+        {"row": 1, "column": SUBJECTS[1], "value": 61},
+    ]
+
+
+def test_batch_missing_a_subject_is_rejected(models):
+    records = [{subject: 40 for subject in SUBJECTS[1:]}]
+    with pytest.raises(ValueError, match=f"missing Semester 1 subjects: {SUBJECTS[0]}"):
+        evaluate_batch(records, 1, models, CURRICULUM)
+
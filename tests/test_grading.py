@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from grading import grade_cohort, grade_semester, grade_student
+from subjects import SEMESTER_SUBJECTS
+
+SEMESTER = 1
+SUBJECTS = SEMESTER_SUBJECTS[SEMESTER]
+
+
+# The rules of the original submit block: a subject below 30 fails, and the
+# percentage is out of 60 marks per subject
+def baseline(student_data):
+    failed = [subject for subject in SUBJECTS if student_data[subject] < 30]
+    total = sum(student_data[subject] for subject in SUBJECTS)
+    return {
+        "total_marks": total,
+        "max_possible": 60 * len(SUBJECTS),
+        "avg_score": total / len(SUBJECTS),
+        "performance_percentage": total / (60 * len(SUBJECTS)) * 100,
+        "pass_status": 0 if failed else 1,
+        "failed_subjects": failed,
+    }
+
+
+@pytest.mark.parametrize("marks", [
+    [30] * 6,
+    [29] + [60] * 5,
+    [30, 29, 30, 29, 30, 29],
+    [0] * 6,
+    [60] * 6,
+    [45, 52, 31, 38, 57, 44],
+])
+def test_grade_student_matches_baseline(marks):
+    student_data = dict(zip(SUBJECTS, marks))
+    result = grade_student(student_data, SEMESTER)
+    expected = baseline(student_data)
+    assert result == pytest.approx(expected)
+    assert result["failed_subjects"] == expected["failed_subjects"]
+
+
+def test_grade_semester_matches_baseline_for_a_cohort():
+    rng = np.random.default_rng(0)
+    marks = rng.integers(25, 35, size=(500, len(SUBJECTS)))
+    grades = grade_semester(marks, SEMESTER)
+    for row, grade in zip(marks, zip(grades.total, grades.average, grades.percentage, grades.passed, grades.failed)):
+        expected = baseline(dict(zip(SUBJECTS, row.tolist())))
+        total, average, percentage, passed, failed = grade
+        assert (total, passed) == (expected["total_marks"], bool(expected["pass_status"]))
+        assert (average, percentage) == pytest.approx((expected["avg_score"], expected["performance_percentage"]))
+        assert [subject for subject, flag in zip(SUBJECTS, failed) if flag] == expected["failed_subjects"]
+
+
+def test_dataframe_columns_are_read_by_name():
+    df = pd.DataFrame([[29] + [60] * 5], columns=SUBJECTS)
+    shuffled = df[list(reversed(SUBJECTS))].assign(Attendance=90)
+    graded = grade_cohort(shuffled, SEMESTER)
+    assert graded.loc[0, "Total Marks"] == 329
+    assert graded.loc[0, f"Failed {SUBJECTS[0]}"]
+    assert not graded.loc[0, "Passed"]
+    assert graded.loc[0, "Attendance"] == 90
+
+
+def test_dataframe_missing_a_subject_raises_key_error():
+    df = pd.DataFrame([[40] * 5], columns=SUBJECTS[1:])
+    with pytest.raises(KeyError, match=SUBJECTS[0]):
+        grade_semester(df, SEMESTER)
+
+
+@pytest.mark.parametrize("shape", [(3, len(SUBJECTS) - 1), (2, 3, len(SUBJECTS))])
+def test_wrong_shaped_marks_raise_value_error(shape):
+    with pytest.raises(ValueError, match=f"expects {len(SUBJECTS)} subject columns"):
+        grade_semester(np.full(shape, 40), SEMESTER)
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from curriculum import get_curriculum
+from importer import STUDENT_ID_COLUMN, import_mark_sheet, validate_chunk
+from store import SQLitePerformanceStore
+
+CURRICULUM = get_curriculum()
+SUBJECTS = CURRICULUM.semesters[1]
+
+
+# Five students, one with a blank Student ID and one with a blank Attendance
+def sheet():
+    df = pd.DataFrame({subject: [40, 25, 50, 35, 45] for subject in SUBJECTS})
+    df.insert(0, STUDENT_ID_COLUMN, pd.array([1001, 1002, None, 1004, 1005], dtype="Int64"))
+    df["Attendance"] = [90, 80, 70, None, 60]
+    return df
+
+
+# Import chunk by chunk and store each chunk's valid rows, as the app does
+def import_into(store, source):
+    def save(chunk, graded):
+        store.save_cohort(1, chunk.loc[graded.index], id_column=STUDENT_ID_COLUMN)
+
+    return import_mark_sheet(source, 1, chunk_size=2, on_chunk=save, curriculum=CURRICULUM)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLitePerformanceStore(tmp_path / "performance.db", CURRICULUM)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_blank_student_id_is_reported_not_stored(store, tmp_path, suffix):
+    path = tmp_path / f"sheet{suffix}"
+    if suffix == ".csv":
+        sheet().to_csv(path, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        sheet().to_parquet(path, index=False)
+
+    cohort = import_into(store, path)
+
+    assert cohort.students == 4
+    assert cohort.rows_invalid == 1
+    assert cohort.error_frame()[["Row", "Column"]].values.tolist() == [[2, STUDENT_ID_COLUMN]]
+    # Numeric ids are stored as typed in the app, not as "1001.0"
+    assert store.student_count() == 4
+    assert store.get_performance("1001")[1][SUBJECTS[0]] == 40
+    assert store.get_performance("1004")[1]["Attendance"] is None
+
+
+def test_blank_common_inputs_are_valid():
+    chunk = sheet().drop(columns=[STUDENT_ID_COLUMN])
+    chunk.loc[0, "Attendance"] = 101
+    valid, errors = validate_chunk(chunk, 1, CURRICULUM)
+    assert valid.tolist() == [False, True, True, True, True]
+    assert errors.values.tolist() == [[0, "Attendance", 101.0]]
+
+
+def test_blank_subject_mark_is_rejected():
+    chunk = sheet()
+    chunk[SUBJECTS[1]] = chunk[SUBJECTS[1]].astype(float)
+    chunk.loc[4, SUBJECTS[1]] = None
+    valid, errors = validate_chunk(chunk, 1, CURRICULUM, ids_required=False)
+    assert valid.tolist() == [True, True, True, True, False]
+    assert errors[["Row", "Column"]].values.tolist() == [[4, SUBJECTS[1]]]
@@ -0,0 +1,67 @@
+import csv
+import io
+import zipfile
+
+import pytest
+
+from curriculum import get_curriculum
+from recommendations import StudyPlanArchive, archive_entry_name
+
+CURRICULUM = get_curriculum()
+SUBJECTS = CURRICULUM.semesters[1]
+NONE_FAILED = [False] * len(SUBJECTS)
+FIRST_FAILED = [True] + [False] * (len(SUBJECTS) - 1)
+ALL_FAILED = [True] * len(SUBJECTS)
+
+
+@pytest.mark.parametrize("student_id, name", [
+    ("../x", "_x.md"),
+    ("../../etc/passwd", "_.._etc_passwd.md"),
+    ("C:\\temp\\x", "C_temp_x.md"),
+    (".hidden", "hidden.md"),
+    ("", "student.md"),
+    ("..", "student.md"),
+    (1001, "1001.md"),
+])
+def test_archive_entry_name_stays_inside_the_archive(student_id, name):
+    assert archive_entry_name(student_id, set(), ".md") == name
+
+
+def test_archive_entry_names_never_collide():
+    taken = set()
+    names = [archive_entry_name(student_id, taken, ".md") for student_id in ("a/b", "A/B", "a_b", "a/b")]
+    assert names == ["a_b.md", "A_B-2.md", "a_b-3.md", "a_b-4.md"]
+
+
+def archive_contents(add_batches):
+    file = io.BytesIO()
+    with StudyPlanArchive(file, CURRICULUM) as archive:
+        add_batches(archive)
+    with zipfile.ZipFile(file) as archive:
+        index = list(csv.DictReader(io.StringIO(archive.read("index.csv").decode())))
+        return {name: archive.read(name).decode() for name in archive.namelist() if name != "index.csv"}, index
+
+
+def test_later_chunk_replaces_an_earlier_plan():
+    def add_batches(archive):
+        archive.add([ALL_FAILED, FIRST_FAILED], 1, ["S1", "S2"])
+        archive.add([FIRST_FAILED, NONE_FAILED], 1, ["S1", "S2"])
+
+    plans, index = archive_contents(add_batches)
+    # S1 keeps only the plan from their last row; S2 passed in the end
+    assert list(plans) == ["semester_1/S1.md"]
+    assert f"## {SUBJECTS[0]}" in plans["semester_1/S1.md"]
+    assert f"## {SUBJECTS[1]}" not in plans["semester_1/S1.md"]
+    assert [(row["Student ID"], row["Failed Subjects"], row["File"]) for row in index] == [("S1", "1", "semester_1/S1.md")]
+
+
+def test_duplicate_rows_in_one_chunk_keep_the_last():
+    plans, index = archive_contents(lambda archive: archive.add([ALL_FAILED, FIRST_FAILED], 1, ["S1", "S1"]))
+    assert [row["Failed Subjects"] for row in index] == ["1"]
+    assert plans["semester_1/S1.md"].count("## ") == 1
+
+
+def test_unsafe_ids_get_safe_unique_entries():
+    plans, index = archive_contents(lambda archive: archive.add([FIRST_FAILED] * 3, 1, ["../evil", "a/b", "A/B"]))
+    assert list(plans) == ["semester_1/_evil.md", "semester_1/a_b.md", "semester_1/A_B-2.md"]
+    assert [row["Student ID"] for row in index] == ["../evil", "a/b", "A/B"]
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from curriculum import get_curriculum
+from store import ROLLUP_TABLES, SQLitePerformanceStore
+
+CURRICULUM = get_curriculum()
+# Primary key of each rollup table, used to line rows up before comparing
+KEYS = {
+    "semester": ["semester"],
+    "subjects": ["semester", "subject"],
+    "histogram": ["semester", "subject", "bin"],
+    "percentages": ["semester", "bin"],
+    "factors": ["semester", "factor"],
+}
+
+
+def cohort(semester, ids, rng):
+    subjects = CURRICULUM.semesters[semester]
+    df = pd.DataFrame(rng.integers(0, CURRICULUM.max_marks + 1, size=(len(ids), len(subjects))), columns=subjects)
+    df.insert(0, "Student ID", ids)
+    df["Attendance"] = rng.integers(0, 101, size=len(ids)).astype(float)
+    df["Assignments"] = rng.integers(0, 11, size=len(ids))
+    df["Participation"] = rng.integers(0, 11, size=len(ids))
+    # Common inputs are optional; some students leave them out
+    df.loc[df.index[::7], "Attendance"] = np.nan
+    return df
+
+
+# Rollups in a canonical form: incremental updates can leave histogram bins at
+# zero where a rebuild has no row at all
+def canonical(rollups):
+    tables = {}
+    for name, frame in rollups.items():
+        if "count" in frame.columns:
+            frame = frame[frame["count"] != 0]
+        tables[name] = frame.sort_values(KEYS[name]).reset_index(drop=True)
+    return tables
+
+
+def assert_rollups_match_rebuild(store):
+    incremental = canonical(store.rollups())
+    store.rebuild_rollups()
+    rebuilt = canonical(store.rollups())
+    assert incremental.keys() == rebuilt.keys() == ROLLUP_TABLES.keys()
+    for name in ROLLUP_TABLES:
+        pdt.assert_frame_equal(incremental[name], rebuilt[name], check_dtype=False, rtol=1e-9, obj=name)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLitePerformanceStore(tmp_path / "performance.db", CURRICULUM)
+    yield store
+    store.close()
+
+
+def test_rollups_after_resubmission_match_rebuild(store):
+    rng = np.random.default_rng(1)
+    for semester in (1, 2):
+        store.save_cohort(semester, cohort(semester, [f"S{i:03d}" for i in range(200)], rng))
+
+    # Resubmit some students from the semester tabs, with and without common inputs
+    subjects = CURRICULUM.semesters[1]
+    for student_id in ("S000", "S050", "S199"):
+        marks = dict(zip(subjects, rng.integers(0, CURRICULUM.max_marks + 1, size=len(subjects)).tolist()))
+        store.save_semester(student_id, 1, {**marks, "Attendance": 75, "Assignments": 6, "Participation": 9})
+    store.save_semester("S001", 1, dict.fromkeys(subjects, CURRICULUM.pass_mark - 1))
+    store.save_semester("NEW", 2, dict.fromkeys(CURRICULUM.semesters[2], CURRICULUM.max_marks))
+
+    assert_rollups_match_rebuild(store)
+
+
+def test_rollups_after_reimport_match_rebuild(store):
+    rng = np.random.default_rng(2)
+    store.save_cohort(1, cohort(1, [f"S{i:03d}" for i in range(300)], rng))
+
+    # Re-import an overlapping sheet that lists some students twice
+    ids = [f"S{i:03d}" for i in range(150, 450)] + ["S160", "S400"]
+    store.save_cohort(1, cohort(1, ids, rng))
+
+    assert store.student_count() == 450
+    assert_rollups_match_rebuild(store)
+
+
+def test_save_cohort_skips_rows_without_ids(store):
+    rng = np.random.default_rng(3)
+    df = cohort(1, [1001.0, np.nan, 1003.0, "  ", " S4 "], rng)
+
+    assert store.save_cohort(1, df) == 3
+    assert store.student_count() == 3
+    # Whole-number ids are stored without a ".0", and text ids are stripped
+    assert store.get_performance("1001")[1]
+    assert store.get_performance("S4")[1]
+    assert_rollups_match_rebuild(store)
+
@@ -0,0 +1,30 @@
+import csv
+import io
+import zipfile
+
+from curriculum import get_curriculum
+from store import SQLitePerformanceStore
+from transcripts import export_transcripts
+
+CURRICULUM = get_curriculum()
+
+
+def test_transcript_entries_are_sanitised_and_unique():
+    store = SQLitePerformanceStore(":memory:", CURRICULUM)
+    record = {**dict.fromkeys(CURRICULUM.semesters[1], 40), "Attendance": 90}
+    student_ids = ["../../evil", "a/b", "A_B", ".hidden", "S1"]
+    for student_id in student_ids:
+        store.save_semester(student_id, 1, record)
+
+    file = io.BytesIO()
+    assert export_transcripts(file, store) == len(student_ids)
+    with zipfile.ZipFile(file) as archive:
+        names = archive.namelist()
+        index = list(csv.DictReader(io.StringIO(archive.read("index.csv").decode())))
+
+    # Ids are exported in sorted order; the index maps each one to its entry
+    assert names == ["_.._evil.html", "hidden.html", "A_B.html", "S1.html", "a_b-2.html", "index.csv"]
+    assert {row["Student ID"]: row["File"] for row in index} == {
+        "../../evil": "_.._evil.html", ".hidden": "hidden.html", "A_B": "A_B.html", "S1": "S1.html", "a/b": "a_b-2.html",
+    }
+    store.close()
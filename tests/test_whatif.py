@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from curriculum import get_curriculum
+from whatif import simulate
+
+CURRICULUM = get_curriculum()
+SEMESTER = 1
+SUBJECTS = CURRICULUM.semesters[SEMESTER]
+MAX_MARKS, PASS_MARK = CURRICULUM.max_marks, CURRICULUM.pass_mark
+MAX_POSSIBLE = MAX_MARKS * len(SUBJECTS)
+
+KNOWN = [
+    (None,) * 3 + (45, 50, 38),
+    (40, None, 55, None, 31, None),
+    (20, None, 50, 50, None, 60),
+    (60, 60, 60, 60, None, None),
+    (30, 30, 30, 30, 30, 30),
+    (29, 60, 60, 60, 60, 60),
+]
+TARGETS = [0.0, 50.0, 60.0, 75.5, 100.0]
+
+
+# Every combination of marks for the remaining subjects: totals, whether the
+# semester is passed, and the marks themselves (combinations x remaining)
+def grid(known):
+    remaining = [i for i, mark in enumerate(known) if mark is None]
+    entered = [mark for mark in known if mark is not None]
+    marks = np.array(list(itertools.product(range(MAX_MARKS + 1), repeat=len(remaining))), dtype=int)
+    totals = sum(entered) + marks.sum(axis=1)
+    passed = (marks >= PASS_MARK).all(axis=1) & all(mark >= PASS_MARK for mark in entered)
+    return marks, totals, passed
+
+
+@pytest.mark.parametrize("known", KNOWN)
+@pytest.mark.parametrize("target", TARGETS)
+def test_simulate_matches_brute_force(known, target):
+    outcome = simulate(SEMESTER, known, target, CURRICULUM)
+    marks, totals, passed = grid(known)
+    percentages = totals / MAX_POSSIBLE * 100
+    reaches = passed & (totals >= target / 100 * MAX_POSSIBLE - 1e-9)
+
+    assert outcome["remaining_subjects"] == tuple(s for s, mark in zip(SUBJECTS, known) if mark is None)
+    assert outcome["can_pass"] == passed.any()
+    assert outcome["min_percentage"] == pytest.approx(percentages.min())
+    assert outcome["max_percentage"] == pytest.approx(percentages.max())
+    if passed.any():
+        assert outcome["min_passing_percentage"] == pytest.approx(percentages[passed].min())
+        assert dict(outcome["min_to_pass"]) == {
+            subject: int(marks[passed, column].min()) for column, subject in enumerate(outcome["remaining_subjects"])
+        }
+    else:
+        assert outcome["min_passing_percentage"] is None
+        assert dict(outcome["min_to_pass"]) == {}
+    assert outcome["target_reachable"] == reaches.any()
+
+    if outcome["remaining_subjects"] and reaches.any():
+        uniform = reaches & (marks == marks[:, :1]).all(axis=1)
+        assert outcome["min_for_target_even"] == marks[uniform, 0].min()
+        # One subject varies while every other remaining subject is full
+        single = reaches & ((marks == MAX_MARKS).sum(axis=1) >= marks.shape[1] - 1)
+        assert outcome["min_for_target_single"] == marks[single].min()
+    else:
+        assert outcome["min_for_target_even"] is None
+        assert outcome["min_for_target_single"] is None
+
+
+def test_simulate_result_is_read_only():
+    outcome = simulate(SEMESTER, KNOWN[1], 60.0, CURRICULUM)
+    with pytest.raises(TypeError):
+        outcome["target"] = 0
+    with pytest.raises(TypeError):
+        outcome["min_to_pass"]["C Programming"] = 0
+    with pytest.raises(ValueError):
+        outcome["uniform_marks"][0] = 1
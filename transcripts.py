@@ -0,0 +1,270 @@
+# Per-student HTML transcripts for a whole cohort, rendered across a process
+# pool and streamed into one zip archive.
+#
+#   python transcripts.py --output transcripts.zip [--curriculum ID] [--database PATH] [--workers N]
+import argparse
+import csv
+import html
+import io
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from curriculum import get_curriculum
+from grading import grade_semester
+from recommendations import archive_entry_name
+from store import SQLitePerformanceStore, database_path
+from metrics import count, span
+
+# Worker processes used for rendering
+WORKERS = int(os.environ.get("TRANSCRIPT_WORKERS", os.cpu_count() or 1))
+# Students per task sent to a worker, each read as one page of the store
+TRANSCRIPT_BATCH = 250
+# Tasks queued or running per worker; bounds how many rendered batches can be
+# held in memory before they are written to the archive
+TASKS_PER_WORKER = 2
+# Cohorts smaller than this are rendered in-process; starting workers costs more
+POOL_MIN_STUDENTS = 2000
+# Progress line printed by main() and read back by export_transcripts_in_subprocess
+PROGRESS_PATTERN = re.compile(r"Transcripts rendered: ([\d,]+)/([\d,]+)")
+
+STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+h1 { color: #e84393; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: left; }
+th { background: #f0f8ff; }
+.pass { color: #1e8449; }
+.fail { color: #c0392b; }
+"""
+
+
+# HTML heading and recommendation block for each subject and the credits of
+# each semester, built once per curriculum in every process
+@lru_cache(maxsize=None)
+def _compiled(curriculum):
+    sections = {}
+    for name, subject in curriculum.subjects.items():
+        lines = [f"<h3>{html.escape(name)}</h3>"]
+        if subject.book:
+            lines.append(f"<p>Recommended book: {html.escape(subject.book)}</p>")
+        if subject.topics:
+            lines.append("<p>Important topics:</p><ul>")
+            lines.extend(f"<li>{html.escape(topic)}</li>" for topic in subject.topics)
+            lines.append("</ul>")
+        if subject.syllabus_file:
+            lines.append(f"<p>Syllabus: {html.escape(subject.syllabus_file)}</p>")
+        sections[name] = (f"<p><strong>{html.escape(name)}</strong>: ", "\n".join(lines))
+    credits = {
+        semester: np.array([curriculum.subjects[name].credits or 0 for name in names])
+        for semester, names in curriculum.semesters.items()
+    }
+    return sections, credits
+
+
+# Grade a batch of (student_id, performance_data) with one vectorized pass per
+# semester. Returns, per student, {semester: (total, max_possible, percentage,
+# passed, failed subjects, credits earned)}.
+def _grade_batch(batch, curriculum):
+    _, credits = _compiled(curriculum)
+    results = [{} for _ in batch]
+    for semester, subjects in curriculum.semesters.items():
+        members = [i for i, (_, performance_data) in enumerate(batch) if semester in performance_data]
+        if not members:
+            continue
+        grades = grade_semester([[batch[i][1][semester][subject] for subject in subjects] for i in members], semester, curriculum)
+        earned = ((~grades.failed).astype(int) @ credits[semester]).tolist()
+        rows = zip(grades.total.tolist(), grades.percentage.tolist(), grades.passed.tolist(), grades.failed.tolist(), earned)
+        for i, (total, percentage, passed, failed, credits_earned) in zip(members, rows):
+            results[i][semester] = (
+                total, grades.max_possible, percentage, passed,
+                [subject for subject, flag in zip(subjects, failed) if flag], credits_earned,
+            )
+    return results
+
+
+def _render(student_id, performance_data, results, curriculum):
+    sections, credits = _compiled(curriculum)
+    escaped_id = html.escape(str(student_id))
+
+    rows, attention = [], []
+    passed_semesters, failed_subjects = 0, []
+    for semester, (total, max_possible, percentage, passed, failed, earned) in sorted(results.items()):
+        passed_semesters += passed
+        rows.append(
+            f"<tr><td>{semester}</td><td>{total}/{max_possible}</td><td>{percentage:.1f}%</td>"
+            f"<td>{earned}/{credits[semester].sum()}</td>"
+            f"<td class=\"{'pass' if passed else 'fail'}\">{'Pass' if passed else 'Needs Improvement'}</td></tr>"
+        )
+        if failed:
+            attention.append(f"<h2>Semester {semester}: Subjects Requiring Attention</h2>")
+            for subject in failed:
+                heading, section = sections[subject]
+                attention.append(f"{heading}{performance_data[semester][subject]}/{curriculum.max_marks}</p>")
+                attention.append(section)
+            failed_subjects += failed
+
+    document = "\n".join([
+        "<!DOCTYPE html>",
+        f"<html><head><meta charset=\"utf-8\"><title>Transcript {escaped_id}</title><style>{STYLE}</style></head><body>",
+        "<h1>Academic Transcript</h1>",
+        f"<p>Student ID: {escaped_id}<br>Programme: {html.escape(curriculum.name)} (v{curriculum.version})</p>",
+        "<table><tr><th>Semester</th><th>Total Marks</th><th>Percentage</th><th>Credits Earned</th><th>Status</th></tr>",
+        *rows,
+        "</table>",
+        *attention,
+        "</body></html>",
+    ])
+    return document, (student_id, len(results), passed_semesters, len(failed_subjects), "; ".join(failed_subjects))
+
+
+# Render the transcripts of a batch of (student_id, performance_data); runs in
+# the workers. Returns (HTML, index row) per student.
+def render_batch(batch, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    return [
+        _render(student_id, performance_data, results, curriculum)
+        for (student_id, performance_data), results in zip(batch, _grade_batch(batch, curriculum))
+    ]
+
+
+def render_transcript(student_id, performance_data, curriculum=None):
+    return render_batch([(student_id, performance_data)], curriculum)[0]
+
+
+# Worker-side store, opened once per worker process; SQLite in WAL mode lets
+# every worker read alongside the app
+@lru_cache(maxsize=None)
+def _worker_store(path, curriculum_id):
+    return SQLitePerformanceStore(path, curriculum_id)
+
+
+# Read and render the students from `first` to `last`; runs in the workers
+def render_range(path, curriculum_id, first, last):
+    return render_batch(_worker_store(path, curriculum_id).performance_range(first, last), curriculum_id)
+
+
+# Workers come from a fork server, or are spawned where there is none; they
+# are never forked from the calling process, which may be running threads.
+# Like spawned workers, they import the __main__ module, so a pool is only
+# started from a script with a main guard such as this one; servers use
+# export_transcripts_in_subprocess.
+def _pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _rendered(store, workers):
+    ranges = store.id_ranges(TRANSCRIPT_BATCH)
+    if workers <= 1:
+        for first, last in ranges:
+            yield render_batch(store.performance_range(first, last), store.curriculum)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        pending = deque()
+        for first, last in ranges:
+            pending.append(pool.submit(render_range, store.path, store.curriculum.id, first, last))
+            # Results are taken in submission order, so the archive is deterministic
+            if len(pending) >= workers * TASKS_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Write a transcript for every student in `store` into a zip archive, plus an
+# index.csv. Workers read their own pages of students from the database, so
+# the calling process only pages ids and writes the archive. `on_progress`
+# receives the students done and the cohort size.
+def export_transcripts(file, store, workers=WORKERS, on_progress=None):
+    total = store.student_count()
+    # In-memory databases cannot be opened by the workers
+    if total < POOL_MIN_STUDENTS or store.path == ":memory:":
+        workers = 1
+    index = io.StringIO()
+    writer = csv.writer(index)
+    writer.writerow(["Student ID", "Semesters", "Semesters Passed", "Failed Subjects", "Subjects", "File"])
+
+    done = 0
+    taken = set()
+    with span("transcripts_export"), zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for rendered in _rendered(store, workers):
+            for document, row in rendered:
+                name = archive_entry_name(row[0], taken, ".html")
+                archive.writestr(name, document)
+                writer.writerow([*row, name])
+            done += len(rendered)
+            count("transcripts_rendered_total", len(rendered))
+            if on_progress is not None:
+                on_progress(done, total)
+        archive.writestr("index.csv", index.getvalue())
+    return done
+
+
+# export_transcripts for long-running, multithreaded processes such as the app.
+# Cohorts large enough for a worker pool are exported by `python
+# transcripts.py` in a child process, so workers never start from the server
+# or import its __main__ module; smaller ones are rendered in-process.
+def export_transcripts_in_subprocess(file, store, workers=WORKERS, on_progress=None):
+    if workers <= 1 or store.path == ":memory:" or store.student_count() < POOL_MIN_STUDENTS:
+        return export_transcripts(file, store, workers=1, on_progress=on_progress)
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / "transcripts.zip"
+        command = [
+            sys.executable, str(Path(__file__).resolve()), "--output", str(output),
+            "--curriculum", store.curriculum.id, "--database", store.path, "--workers", str(workers),
+        ]
+        done, messages = 0, deque(maxlen=20)
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as process:
+            # Text mode reads each "\r" progress update as its own line
+            for line in process.stdout:
+                match = PROGRESS_PATTERN.search(line)
+                if match:
+                    done, total = (int(group.replace(",", "")) for group in match.groups())
+                    if on_progress is not None:
+                        on_progress(done, total)
+                elif line.strip():
+                    messages.append(line.strip())
+        if process.returncode:
+            raise ChildProcessError(f"Transcript export failed: {messages[-1] if messages else process.returncode}")
+
+        if hasattr(file, "write"):
+            with open(output, "rb") as archive:
+                shutil.copyfileobj(archive, file)
+        else:
+            shutil.move(output, file)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a transcript for every stored student into a zip archive")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--curriculum", help="curriculum id (default: the default curriculum)")
+    parser.add_argument("--database", help="performance database (default: the curriculum's database)")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    curriculum = get_curriculum(args.curriculum)
+    store = SQLitePerformanceStore(args.database or database_path(curriculum), curriculum)
+    written = export_transcripts(
+        args.output, store, workers=args.workers,
+        on_progress=lambda done, total: print(f"\rTranscripts rendered: {done:,}/{total:,}", end="", flush=True),
+    )
+    print(f"\nWrote {written:,} transcripts to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
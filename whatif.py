@@ -0,0 +1,63 @@
+import math
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from curriculum import get_curriculum
+
+
+# What a student still needs in their remaining subjects. `known` is a tuple
+# with one entry per subject of the semester, None where the mark is not in
+# yet; `target` is the percentage to reach. Results are memoized per input
+# tuple so slider drags only pay for new combinations; the memoized result is
+# shared by every caller, so it is read-only throughout.
+@lru_cache(maxsize=4096)
+def simulate(semester, known, target, curriculum=None):
+    curriculum = get_curriculum(curriculum)
+    subjects = curriculum.semesters[semester]
+    max_marks, pass_mark = curriculum.max_marks, curriculum.pass_mark
+    if len(known) != len(subjects):
+        raise ValueError(f"Semester {semester} expects {len(subjects)} marks, got {len(known)}")
+
+    max_possible = max_marks * len(subjects)
+    entered = np.array([mark for mark in known if mark is not None], dtype=float)
+    remaining = tuple(subject for subject, mark in zip(subjects, known) if mark is None)
+    k = len(remaining)
+    known_total = float(entered.sum())
+    failed_known = tuple(subject for subject, mark in zip(subjects, known) if mark is not None and mark < pass_mark)
+
+    # Every remaining subject scoring the same mark m, for all m at once
+    uniform = np.arange(max_marks + 1)
+    uniform_percentage = (known_total + k * uniform) / max_possible * 100
+    uniform_passed = (uniform >= pass_mark) & (not failed_known)
+    for array in (uniform, uniform_percentage, uniform_passed):
+        array.setflags(write=False)
+
+    # Closed-form minimums for the target while still passing: the smallest
+    # even mark across the remaining subjects, and the smallest single mark if
+    # every other remaining subject is full
+    needed = math.ceil(target / 100 * max_possible - known_total - 1e-9)
+    if k:
+        even = max(pass_mark, math.ceil(needed / k))
+        single = max(pass_mark, needed - max_marks * (k - 1))
+    else:
+        even = single = None
+    target_reachable = not failed_known and (needed <= 0 if k == 0 else even <= max_marks)
+
+    return MappingProxyType({
+        "remaining_subjects": remaining,
+        "failed_subjects": failed_known,
+        "can_pass": not failed_known,
+        "min_to_pass": MappingProxyType({subject: pass_mark for subject in remaining} if not failed_known else {}),
+        "target": target,
+        "target_reachable": target_reachable,
+        "min_for_target_even": even if target_reachable else None,
+        "min_for_target_single": single if target_reachable else None,
+        "min_percentage": float(uniform_percentage[0]),
+        "min_passing_percentage": float(uniform_percentage[pass_mark]) if not failed_known else None,
+        "max_percentage": float(uniform_percentage[-1]),
+        "uniform_marks": uniform,
+        "uniform_percentage": uniform_percentage,
+        "uniform_passed": uniform_passed,
+    })